@@ -22,21 +22,18 @@ def convert_numpy_types(df):
     if df is None or df.empty:
         return df
 
-    def convert_value(val):
-        if isinstance(val, np.integer):
-            return int(val)
-        elif isinstance(val, np.floating):
-            return float(val)
-        elif isinstance(val, np.ndarray):
-            return val.tolist()
-        elif isinstance(val, np.bool_):
-            return bool(val)
-        else:
-            return val
-
+    # Un solo cast por columna en lugar de convertir valor por valor: los enteros con signo
+    # de NumPy quedan como int64 y los flotantes como float64. Los enteros sin signo (uint64
+    # no entra en int64) y los enteros nullable (Int64 con NA pasaría a float64 y perdería
+    # precisión en CUITs e IDs grandes) se dejan como están
     for col in df.columns:
-        if df[col].dtype.kind in 'iufc':
-            df[col] = df[col].apply(convert_value)
+        dtype = df[col].dtype
+        if not isinstance(dtype, np.dtype):
+            continue
+        if dtype.kind == 'i':
+            df[col] = df[col].astype('int64')
+        elif dtype.kind == 'f':
+            df[col] = df[col].astype('float64')
     return df
 
 class ParquetLoader:
@@ -57,18 +54,29 @@ def safe_read_parquet(file_path_or_buffer, is_buffer=False, columns=None):
         import pyarrow.parquet as pq
         import pyarrow as pa
 
-        if is_buffer:
-            table = pq.read_table(file_path_or_buffer, columns=columns)
-        else:
-            table = pq.read_table(file_path_or_buffer, columns=columns)
-
-        try:
-            df = table.to_pandas()
-        except pa.ArrowInvalid as e:
-            if "out of bounds timestamp" in str(e):
-                df = table.to_pandas(timestamp_as_object=True)
-            else:
-                raise
+        # Un solo ParquetFile para el schema y los datos, sin abrir el archivo dos veces.
+        # Los archivos del caché en disco se mapean en memoria en lugar de copiarlos a un buffer.
+        # El with cierra el archivo y libera el mapeo al terminar (también si la lectura falla);
+        # la conversión a pandas va adentro para que nada quede apuntando al archivo mapeado
+        with pq.ParquetFile(file_path_or_buffer, memory_map=not is_buffer) as archivo_parquet:
+            if columns is not None:
+                # Proyectar solo las columnas que existen en el archivo; las que falten se ignoran
+                # en lugar de hacer fallar la lectura completa. Solo se leen esos column chunks
+                nombres_schema = set(archivo_parquet.schema_arrow.names)
+                columns = [col for col in columns if col in nombres_schema]
+
+            table = archivo_parquet.read(columns=columns)
+
+            # Sin split_blocks: con él las columnas numéricas sin nulos quedan como vistas de solo
+            # lectura sobre los buffers de Arrow (o del archivo mapeado) y cualquier escritura en
+            # el lugar sobre el DataFrame falla. Al consolidar, pandas copia a arrays propios
+            try:
+                df = table.to_pandas()
+            except pa.ArrowInvalid as e:
+                if "out of bounds timestamp" in str(e):
+                    df = table.to_pandas(timestamp_as_object=True)
+                else:
+                    raise
     except (ImportError, Exception):
         try:
             if is_buffer:
@@ -115,6 +123,13 @@ def procesar_archivo(nombre, contenido, es_buffer, logs=None, columns=None):
                 df, error = safe_read_parquet(contenido, columns=columns)
                 fecha = datetime.datetime.now()
             
+            # Las columnas pedidas que no están en el archivo se ignoran al leer: se registran
+            # para que un cambio de esquema no pase desapercibido
+            if df is not None and columns is not None:
+                faltantes = [col for col in columns if col not in df.columns]
+                if faltantes:
+                    logs["warnings"].append(f"{nombre}: columnas no encontradas en el archivo: {', '.join(faltantes)}")
+            
             # Optimizar DataFrame después de cargarlo
             if df is not None:
                 from utils.parquet_utils import optimize_dataframe
@@ -145,6 +160,9 @@ def procesar_archivo(nombre, contenido, es_buffer, logs=None, columns=None):
             else:
                 gdf = gpd.read_file(contenido)
                 fecha = datetime.datetime.now()
+            # Normalizar el código de departamento una sola vez al cargar la capa
+            if 'CODDEPTO' in gdf.columns:
+                gdf['CODDEPTO'] = gdf['CODDEPTO'].astype(str).str.strip()
             return gdf, fecha
         else:
             return None, None
@@ -31,11 +31,14 @@ def add_breadcrumb(category=None, message=None, data=None, level=None): pass
 # =============================================================================
 
 COLUMNAS_NECESARIAS = {
-    # DESHABILITADO TEMPORALMENTE - Las columnas especificadas no coinciden con las reales
-    # TODO: Actualizar con las columnas correctas de los archivos Parquet
-    # Por ahora se cargan todas las columnas y se optimizan los tipos de datos
+    # None = se cargan todas las columnas. Las columnas listadas que no estén en el archivo
+    # se ignoran y procesar_archivo (moduls/carga.py) las registra en los warnings de carga
     'df_postulantes_empleo.parquet': None,
-    'df_inscriptos_empleo.parquet': None,
+    # Columnas que usa el módulo de empleo (KPIs, pivot por programa, localidades y mapa)
+    'df_inscriptos_empleo.parquet': [
+        'CUIL', 'IDETAPA', 'ID_EST_FIC', 'PROGRAMA', 'N_ESTADO_FICHA', 'BEN_N_ESTADO',
+        'ZONA', 'N_DEPARTAMENTO', 'N_LOCALIDAD', 'ID_DEPARTAMENTO_GOB',
+    ],
     'df_empresas.parquet': None,
     'df_global_banco.parquet': None,
     'df_global_pagados.parquet': None,
@@ -228,6 +231,10 @@ def procesar_archivo_optimizado(nombre: str,
                 # Simplificar con tolerancia de 0.01 grados (~1km)
                 gdf['geometry'] = gdf['geometry'].simplify(tolerance=0.01, preserve_topology=True)
 
+            # Normalizar el código de departamento una sola vez al cargar la capa
+            if 'CODDEPTO' in gdf.columns:
+                gdf['CODDEPTO'] = gdf['CODDEPTO'].astype(str).str.strip()
+
             fecha = datetime.datetime.now()
             return gdf, fecha
 
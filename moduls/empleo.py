@@ -5,19 +5,841 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from utils.ui_components import display_kpi_row, show_last_update
+from utils.session_helper import safe_session_get, safe_session_set
 from utils.map_utils import create_choropleth_map, display_map
 from utils.styles import COLORES_IDENTIDAD
 from utils.data_cleaning import clean_thousand_separator, convert_decimal_separator
 from utils.kpi_tooltips import TOOLTIPS_DESCRIPTIVOS, ESTADO_TOOLTIPS
 from streamlit_folium import folium_static
 import geopandas as gpd
+import pyarrow as pa
+import pyarrow.compute as pc
 import math
+import functools
 import altair as alt
 from io import StringIO
 import datetime
 import io
 
 
+# Tabla de traducción para mostrar el separador de miles con punto
+_COMMA_TO_DOT = str.maketrans(',', '.')
+
+
+def formato_miles(valor):
+    """
+    Formatea un número entero con punto como separador de miles (ej: 12.345).
+    """
+    return format(int(valor), ',d').translate(_COMMA_TO_DOT)
+
+
+# Fragmentos HTML fijos que se repiten en la vista
+_HTML_CIERRE_DIV = '</div>'
+_HTML_CHART_CONTAINER = '<div class="chart-container">'
+_HTML_FILTER_SECTION = '<div class="filter-section">'
+_HTML_INFO_BOX = '<div class="info-box status-{estado}"><strong>{titulo}:</strong> {mensaje}</div>'
+
+# Columnas de conteo de beneficiarios usadas en las tablas por localidad y departamento
+ESTADOS_BENEFICIARIO = ["BENEFICIARIO", "BENEFICIARIO- CTI"]
+
+# Mapeo de programas según IDETAPA
+PROGRAMAS_ETAPA = {
+    53: "Programa Primer Paso",
+    51: "Más 26",
+    54: "CBA Mejora",
+    55: "Nueva Oportunidad",
+    57: "Más 26 [2025]",
+    58: "PPP [2025]"
+}
+
+# Estados de ficha (ID_EST_FIC) que se muestran en los KPIs de inscripciones
+ESTADOS_FICHA_KPI = [2, 3, 8, 12, 13, 14, 17, 18, 19]
+ESTADOS_FICHA_RECHAZO = [17, 18, 19]
+
+# Valor de ZONA (ya calculado en el parquet) para departamentos con tratamiento preferencial
+ZONA_FAVORECIDA = 'ZONA NOC Y SUR'
+
+# Estados de BEN_N_ESTADO que cuentan como beneficiario activo en los KPIs del tablero
+BEN_ESTADOS_ACTIVOS = frozenset({"BENEFICIARIO RETENIDO", "ACTIVO", "BAJA PEDIDO POR EMPRESA"})
+
+# Valores de ADHERIDO que usan los tramos de cupo de Empleo +26
+ADHERIDO_EMPLEO_26 = frozenset({"EMPLEO +26", "EMPLEO +26 [2025]"})
+
+# Columnas de baja cardinalidad que se filtran/agrupan en el tablero
+COLUMNAS_CATEGORICAS = ['N_ESTADO_FICHA', 'N_DEPARTAMENTO', 'N_LOCALIDAD', 'ZONA', 'N_CATEGORIA_EMPLEO',
+                        'PROGRAMA', 'BEN_N_ESTADO', 'DENOM_PROG', 'ADHERIDO']
+
+
+def to_categorical(df, columns=COLUMNAS_CATEGORICAS):
+    """
+    Convierte a dtype category las columnas indicadas que existan en el DataFrame,
+    para que isin, groupby y unique operen sobre códigos enteros.
+    
+    Args:
+        df (pd.DataFrame): DataFrame a convertir (se modifica in place)
+        columns (list): Columnas a convertir
+    Returns:
+        pd.DataFrame: El mismo DataFrame con las columnas convertidas
+    """
+    if df is None:
+        return df
+    for col in columns:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def valores_ordenados(serie):
+    """
+    Valores no nulos distintos de una columna, ordenados, para las opciones de los filtros.
+    En columnas categóricas se cuentan los códigos con np.bincount y se ordenan solo las
+    categorías presentes (sin hashear ni deduplicar los valores fila por fila).
+    
+    Args:
+        serie (pd.Series): Columna de la que se toman las opciones
+    Returns:
+        list: Valores distintos ordenados
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = serie.cat.codes.to_numpy()
+        presentes = np.bincount(codigos[codigos >= 0], minlength=len(serie.cat.categories)) > 0
+        return sorted(serie.cat.categories[presentes])
+    return sorted(serie.dropna().unique())
+
+
+# Columnas de códigos enteros chicos (etapa y estado de ficha) que se comparan contra literales
+COLUMNAS_CODIGOS = ['IDETAPA', 'ID_EST_FIC']
+
+
+def to_small_int(df, columns=COLUMNAS_CODIGOS):
+    """
+    Convierte columnas de códigos enteros a Int8 (admite nulos), así los filtros por
+    igualdad y los value_counts recorren 1 byte por fila en lugar de 8.
+    Si una columna tiene valores que no entran en Int8 se deja como está.
+    
+    Args:
+        df (pd.DataFrame): DataFrame a convertir (se modifica en el lugar)
+        columns (list): Columnas a convertir si existen
+    Returns:
+        pd.DataFrame: El mismo DataFrame con las columnas convertidas
+    """
+    if df is None:
+        return df
+    for col in columns:
+        if col in df.columns and df[col].dtype != 'Int8' and pd.api.types.is_numeric_dtype(df[col]):
+            try:
+                df[col] = df[col].astype('Int8')
+            except (TypeError, ValueError):
+                pass
+    return df
+
+
+# Columnas de conteo de empresas que se suman y comparan en la vista de empresas
+COLUMNAS_CONTEO_EMPRESAS = ['CANTIDAD_EMPLEADOS', 'VACANTES']
+
+
+def conteos_a_entero(df, columns=COLUMNAS_CONTEO_EMPRESAS):
+    """
+    Deja las columnas de conteo como enteros sin nulos: las que faltan se crean en 0, las
+    que ya son numéricas sin nulos no se tocan y el resto se convierte en una sola asignación
+    (no numéricos y nulos pasan a 0, y se baja al entero más chico que contiene los valores).
+    
+    Args:
+        df (pd.DataFrame): DataFrame a convertir (se modifica en el lugar)
+        columns (list): Columnas de conteo
+    Returns:
+        pd.DataFrame: El mismo DataFrame con las columnas convertidas
+    """
+    if df is None:
+        return df
+    for col in columns:
+        if col not in df.columns:
+            df[col] = 0
+    columnas_a_convertir = [
+        col for col in columns
+        if not (pd.api.types.is_numeric_dtype(df[col]) and not df[col].hasnans)
+    ]
+    if columnas_a_convertir:
+        df[columnas_a_convertir] = (
+            df[columnas_a_convertir]
+            .apply(pd.to_numeric, errors='coerce')
+            .fillna(0)
+            .apply(pd.to_numeric, downcast='integer')
+        )
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def _etapas_validas(etapas):
+    """
+    Etapas presentes en los datos que corresponden a un programa conocido,
+    en el orden en que aparecen. Se cachea para no recorrer la columna en cada rerun.
+    
+    Args:
+        etapas (pd.Series): Columna IDETAPA
+    Returns:
+        tuple: Etapas de PROGRAMAS_ETAPA presentes en los datos
+    """
+    # Pertenencia vectorizada con np.isin antes del unique (sin recorrer etapas en Python)
+    valores = etapas.to_numpy(dtype='float64', na_value=np.nan)
+    valores = valores[np.isin(valores, list(PROGRAMAS_ETAPA))]
+    return tuple(int(etapa) for etapa in pd.unique(valores))
+
+
+@st.cache_data(show_spinner=False)
+def _conteo_estados_por_etapa(df):
+    """
+    Cuenta las fichas por etapa (IDETAPA) y estado (ID_EST_FIC) una sola vez para todos
+    los programas; elegir un programa en el selector es solo leer una fila de la tabla.
+    
+    Args:
+        df (pd.DataFrame): Inscriptos con IDETAPA e ID_EST_FIC
+    Returns:
+        pd.DataFrame: Una fila por etapa y una columna por estado de ESTADOS_FICHA_KPI
+    """
+    # dropna=False mantiene las etapas cuyas fichas no tienen estado (se muestran con 0)
+    return (df.groupby(['IDETAPA', 'ID_EST_FIC'], observed=True, dropna=False).size()
+            .unstack(fill_value=0)
+            .reindex(columns=ESTADOS_FICHA_KPI, fill_value=0))
+
+
+def _es_columna_texto(serie):
+    """
+    Indica si la serie guarda texto que los kernels de Arrow pueden recorrer: object con
+    strings (los nulos no cuentan), StringDtype, o una categórica cuyas categorías son texto.
+    
+    Args:
+        serie (pd.Series): Serie a revisar
+    Returns:
+        bool: True si la serie es de texto
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return _es_columna_texto(pd.Series(serie.cat.categories))
+    if isinstance(serie.dtype, pd.StringDtype):
+        return True
+    return pd.api.types.is_object_dtype(serie) and pd.api.types.infer_dtype(serie, skipna=True) in ('string', 'empty')
+
+
+def normalizar_cuil(df, columna='CUIL'):
+    """
+    Deja la columna de CUIL/CUIT como texto sin guiones. Si ya está normalizada no la reescribe.
+    Si la columna es categórica se limpian solo sus categorías.
+    
+    Args:
+        df (pd.DataFrame): DataFrame con la columna (se modifica en el lugar)
+        columna (str): Columna a normalizar ('CUIL' o 'CUIT')
+    Returns:
+        pd.DataFrame: El mismo DataFrame
+    """
+    if df is None or columna not in df.columns:
+        return df
+    cuil = df[columna]
+    if isinstance(cuil.dtype, pd.CategoricalDtype):
+        # Los kernels de texto de Arrow no aceptan arrays diccionario: se limpian las categorías
+        # (pocas) y cada fila toma la suya por código
+        categorias = pd.Series(cuil.cat.categories)
+        limpias = _sin_guiones(categorias)
+        if limpias is categorias:
+            return df
+        if limpias.is_unique:
+            df[columna] = cuil.cat.rename_categories(limpias.to_numpy())
+        else:
+            # Dos categorías que solo diferían en los guiones: se expande a texto
+            valores = limpias.to_numpy(dtype=object)[cuil.cat.codes.to_numpy()]
+            valores[cuil.isna().to_numpy()] = np.nan
+            df[columna] = valores
+        return df
+    limpias = _sin_guiones(cuil)
+    if limpias is not cuil:
+        df[columna] = limpias
+    return df
+
+
+def _sin_guiones(serie):
+    """
+    Quita los guiones de una serie de texto (o la pasa a texto) con los kernels de Arrow,
+    en C y sin iterar los strings en Python.
+    
+    Args:
+        serie (pd.Series): Serie no categórica
+    Returns:
+        pd.Series: La misma serie si no había nada que cambiar; si no, una serie nueva
+    """
+    convertir = not _es_columna_texto(serie)
+    if convertir:
+        texto = serie.astype(str)
+        # Un CUIL entero no tiene guiones: alcanza con la conversión a texto, sin pasar por Arrow
+        if pd.api.types.is_integer_dtype(serie):
+            return texto
+        serie_texto = texto
+    else:
+        serie_texto = serie
+    cuil_arrow = pa.array(serie_texto, from_pandas=True, type=pa.string())
+    if not convertir and not pc.any(pc.match_substring(cuil_arrow, '-')).as_py():
+        return serie
+    return pd.Series(pd.array(pc.replace_substring(cuil_arrow, pattern='-', replacement=''), dtype=serie_texto.dtype),
+                     index=serie.index, name=serie.name)
+
+
+def cuit_a_entero(df, columna='CUIT'):
+    """
+    Convierte una columna de CUIT ya sin guiones a Int64, así los isin, groupby y merge
+    por CUIT comparan enteros en lugar de recorrer strings. Solo convierte si todos los
+    valores no nulos son dígitos; si no, la columna queda como está. Si la columna es
+    categórica se validan y convierten solo sus categorías.
+    
+    Args:
+        df (pd.DataFrame): DataFrame con la columna (se modifica en el lugar)
+        columna (str): Columna a convertir
+    Returns:
+        pd.DataFrame: El mismo DataFrame
+    """
+    if df is None or columna not in df.columns or not _es_columna_texto(df[columna]):
+        return df
+    cuit = df[columna]
+    categorica = isinstance(cuit.dtype, pd.CategoricalDtype)
+    # Los kernels de texto de Arrow no aceptan arrays diccionario: con una categórica se
+    # trabaja sobre las categorías (texto plano, sin nulos)
+    valores = pd.Series(cuit.cat.categories) if categorica else cuit
+    cuit_arrow = pa.array(valores, from_pandas=True, type=pa.string())
+    if not pc.all(pc.match_substring_regex(cuit_arrow, r'^\d{1,18}$')).as_py():
+        return df
+    cuit_int = pc.cast(cuit_arrow, pa.int64())
+    if categorica:
+        codigos = cuit.cat.codes.to_numpy()
+        enteros = cuit_int.to_numpy(zero_copy_only=False)
+        df[columna] = pd.arrays.IntegerArray(enteros[codigos], codigos == -1)
+    else:
+        df[columna] = cuit_int.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get).array
+    return df
+
+
+def preparar_datos_empleo(df_postulantes_empleo, df_inscriptos, df_empresas):
+    """
+    Aplica en un solo paso las conversiones que necesitan las vistas de empleo:
+    columnas categóricas, códigos de etapa/estado como Int8, CUIL sin guiones, CUIT
+    sin guiones como entero y conteos de empresas como enteros.
+    Cada conversión se saltea si la columna ya tiene el tipo/formato esperado.
+    
+    Args:
+        df_postulantes_empleo (pd.DataFrame): Postulantes (se modifica en el lugar)
+        df_inscriptos (pd.DataFrame): Inscriptos (se modifica en el lugar)
+        df_empresas (pd.DataFrame): Empresas (se modifica en el lugar)
+    Returns:
+        tuple: Los mismos tres DataFrames
+    """
+    for df in (df_postulantes_empleo, df_inscriptos, df_empresas):
+        to_categorical(df)
+    to_small_int(df_inscriptos)
+    normalizar_cuil(df_inscriptos)
+    # CUIT solo se limpia si viene como texto: un CUIT numérico no tiene guiones
+    for df in (df_empresas, df_postulantes_empleo):
+        if df is not None and 'CUIT' in df.columns and _es_columna_texto(df['CUIT']):
+            normalizar_cuil(df, 'CUIT')
+            cuit_a_entero(df)
+    conteos_a_entero(df_empresas)
+    return df_postulantes_empleo, df_inscriptos, df_empresas
+
+
+def _huella_datos(dates, frames):
+    """
+    Huella de la versión de los datos de empleo, clave de los cachés de la preparación y de
+    las vistas. Las fechas de commit de GitLab traen zona horaria; cuando falta la fecha de
+    commit la carga usa datetime.now() (sin zona), que cambia en cada recarga. Por eso las
+    fechas solo se usan si todas son de commit; si no, la huella es el hash del contenido.
+    
+    Args:
+        dates (dict): Fechas de actualización por archivo
+        frames (tuple): DataFrames de origen (sin preparar)
+    Returns:
+        tuple | None: Huella hashable, o None si no se puede calcular
+    """
+    if dates and all(isinstance(fecha, datetime.datetime) and fecha.tzinfo is not None for fecha in dates.values()):
+        return tuple(sorted(dates.items()))
+    try:
+        return tuple(
+            None if df is None else
+            (df.shape, tuple(df.columns), int(pd.util.hash_pandas_object(df, index=False).sum()))
+            for df in frames
+        )
+    except TypeError:
+        # Columnas con valores no hasheables (listas, dicts): sin huella no se cachea
+        return None
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _datos_empleo_preparados(huella, _df_postulantes_empleo, _df_inscriptos, _df_empresas):
+    """
+    Prepara los DataFrames de empleo una sola vez por versión de los datos y los comparte
+    entre reruns y sesiones. La clave es la huella (ver _huella_datos); los DataFrames no
+    se hashean. Las vistas solo leen los DataFrames devueltos.
+    
+    Args:
+        huella (tuple): Huella de la versión de los datos
+        _df_postulantes_empleo (pd.DataFrame): Postulantes
+        _df_inscriptos (pd.DataFrame): Inscriptos
+        _df_empresas (pd.DataFrame): Empresas
+    Returns:
+        tuple: Los tres DataFrames preparados
+    """
+    return preparar_datos_empleo(_df_postulantes_empleo, _df_inscriptos, _df_empresas)
+
+
+@st.cache_resource(show_spinner=False, hash_funcs={gpd.GeoDataFrame: lambda gdf: (gdf.shape, tuple(gdf.columns), tuple(gdf.total_bounds))})
+def _normalize_geojson(geojson_data):
+    """
+    Convierte la capa de departamentos a un diccionario GeoJSON.
+    CODDEPTO ya viene normalizado desde la carga; si llega un GeoDataFrame se
+    normaliza por columna antes de serializar, sin recorrer las features.
+    Se cachea como recurso: el diccionario se arma una sola vez y los reruns
+    reciben el mismo objeto, sin copiarlo (no debe modificarse).
+    
+    Args:
+        geojson_data: GeoDataFrame, DataFrame o diccionario GeoJSON
+    Returns:
+        tuple: (diccionario GeoJSON o None si el formato no es reconocido,
+            códigos CODDEPTO de las features para usar como clave de caché del mapa)
+    """
+    geojson_dict = None
+    if isinstance(geojson_data, (pd.DataFrame, gpd.GeoDataFrame)):
+        gdf = gpd.GeoDataFrame(geojson_data)
+        if 'CODDEPTO' in gdf.columns:
+            gdf = gdf.assign(CODDEPTO=gdf['CODDEPTO'].astype(str).str.strip())
+        geojson_dict = gdf.__geo_interface__
+    elif isinstance(geojson_data, dict) and 'features' in geojson_data:
+        geojson_dict = geojson_data
+    
+    geojson_key = ()
+    if geojson_dict and 'features' in geojson_dict:
+        geojson_key = tuple(f['properties'].get('CODDEPTO') for f in geojson_dict['features'])
+    return geojson_dict, geojson_key
+
+
+@st.cache_data(show_spinner=False)
+def _agregar_beneficiarios(df_beneficiarios):
+    """
+    Agrega los beneficiarios una sola vez y deriva de ese conteo las tablas
+    por localidad y por departamento. Se cachea por contenido, así los reruns
+    con los mismos filtros no recalculan.
+    
+    Args:
+        df_beneficiarios (pd.DataFrame): Beneficiarios con N_DEPARTAMENTO, N_LOCALIDAD,
+            N_ESTADO_FICHA y opcionalmente ID_DEPARTAMENTO_GOB
+    Returns:
+        tuple: (df_mapa, df_mapa_geo) conteo por localidad (columna TOTAL, ordenado por TOTAL) y por departamento
+            (columna Total, ID_DEPARTAMENTO_GOB como string); df_mapa_geo es None si no hay ID_DEPARTAMENTO_GOB
+    """
+    tiene_id_depto = 'ID_DEPARTAMENTO_GOB' in df_beneficiarios.columns
+    claves = ['N_DEPARTAMENTO', 'N_LOCALIDAD', 'N_ESTADO_FICHA']
+    if tiene_id_depto:
+        claves = ['ID_DEPARTAMENTO_GOB'] + claves
+    
+    # Conteo en formato largo; dropna=False para no perder localidades sin ID de departamento.
+    # La columna 'BENEFICIARIO- CTI' queda en 0 por el reindex si no hay datos de ese estado
+    conteo = (df_beneficiarios.groupby(claves, observed=True, dropna=False)
+              .size()
+              .unstack('N_ESTADO_FICHA', fill_value=0)
+              .reindex(columns=ESTADOS_BENEFICIARIO, fill_value=0)
+              .rename_axis(columns=None))
+    
+    df_mapa = conteo.groupby(level=['N_DEPARTAMENTO', 'N_LOCALIDAD'], observed=True).sum().reset_index()
+    df_mapa['TOTAL'] = df_mapa['BENEFICIARIO'] + df_mapa['BENEFICIARIO- CTI']
+    # Se devuelve ya ordenada como se muestra, así el orden también queda cacheado
+    df_mapa = df_mapa.sort_values(['TOTAL', 'N_DEPARTAMENTO'], ascending=[False, True])
+    
+    df_mapa_geo = None
+    if tiene_id_depto:
+        df_mapa_geo = conteo.groupby(level=['ID_DEPARTAMENTO_GOB', 'N_DEPARTAMENTO'], observed=True).sum().reset_index()
+        df_mapa_geo['Total'] = df_mapa_geo['BENEFICIARIO'] + df_mapa_geo['BENEFICIARIO- CTI']
+        
+        # Convertir ID_DEPARTAMENTO_GOB a string (entero sin decimales, "" si falta) sin apply por fila
+        ids = pd.to_numeric(df_mapa_geo['ID_DEPARTAMENTO_GOB'], errors='coerce')
+        validos = ids.notna().to_numpy()
+        ids_texto = np.full(len(ids), "", dtype=object)
+        ids_texto[validos] = ids.to_numpy()[validos].astype(np.int64).astype(str)
+        df_mapa_geo['ID_DEPARTAMENTO_GOB'] = ids_texto
+    
+    return df_mapa, df_mapa_geo
+
+
+def _conteo_programa_estado(df):
+    """
+    Cuenta fichas por PROGRAMA y N_ESTADO_FICHA para la tabla pivot de inscripciones.
+    La columna BENEFICIARIO cuenta solo beneficiarios activos (BEN_N_ESTADO == 'ACTIVO').
+    Sin caché propio: solo se llama desde _tablas_pivot_html, que ya está cacheado.
+    
+    Args:
+        df (pd.DataFrame): Inscriptos con PROGRAMA, N_ESTADO_FICHA y opcionalmente BEN_N_ESTADO
+    Returns:
+        pd.DataFrame: Conteos con PROGRAMA como índice y un estado por columna
+    """
+    # Conteo directo con groupby: para contar filas no hace falta la maquinaria general de pivot_table
+    pivot_table = df.groupby(['PROGRAMA', 'N_ESTADO_FICHA'], observed=True).size().unstack(fill_value=0)
+
+    # Ajustar la columna 'BENEFICIARIO' para contar solo beneficiarios activos
+    if 'BEN_N_ESTADO' in df.columns:
+        df_activos = df[(df['N_ESTADO_FICHA'] == "BENEFICIARIO") & (df['BEN_N_ESTADO'] == "ACTIVO")]
+        if not df_activos.empty:
+            pivot_activos = df_activos.groupby('PROGRAMA', observed=True).size()
+            # Sobrescribir la columna BENEFICIARIO con el conteo de activos
+            if 'BENEFICIARIO' in pivot_table.columns:
+                pivot_table['BENEFICIARIO'] = pivot_activos.reindex(pivot_table.index, fill_value=0)
+    return pivot_table
+
+
+@st.cache_data(show_spinner=False)
+def _tablas_pivot_html(df):
+    """
+    Arma las tablas HTML de conteo por PROGRAMA y N_ESTADO_FICHA (principal y casos especiales).
+    El resultado depende solo de los datos filtrados, así que se cachea y un rerun con los
+    mismos filtros no vuelve a generar el HTML.
+    
+    Args:
+        df (pd.DataFrame): Inscriptos con PROGRAMA, N_ESTADO_FICHA y opcionalmente BEN_N_ESTADO
+    Returns:
+        tuple: (html de la tabla principal, html de la tabla de casos especiales o None)
+    """
+    pivot_table = _conteo_programa_estado(df)
+    
+    # Definir el orden de las columnas por grupos
+    grupo1 = ["POSTULANTE APTO", "INSCRIPTO", "BENEFICIARIO"]
+    grupo2 = ["INSCRIPTO - CTI", "RETENIDO - CTI", "VALIDADO - CTI", "BENEFICIARIO- CTI", "BAJA - CTI"]
+    grupo3 = ["POSTULANTE SIN EMPRESA", "FUERA CUPO DE EMPRESA", "RECHAZO FORMAL", "INSCRIPTO NO ACEPTADO", "DUPLICADO", "EMPRESA NO APTA"]
+
+    # Crear una lista con todas las columnas en el orden deseado
+    columnas_ordenadas = grupo1 + grupo2 + grupo3
+
+    # Añadir totales primero para cálculos internos, pero no los mostraremos
+    pivot_table['Total'] = pivot_table.sum(axis=1)
+    pivot_table.loc['Total'] = pivot_table.sum()
+
+    # Estados que no pertenecen a ningún grupo (pertenencia contra un set, una sola pasada)
+    columnas_ordenadas_set = set(columnas_ordenadas)
+    otros_cols = [col for col in pivot_table.columns if col not in columnas_ordenadas_set and col != 'Total']
+
+    # Reordenar con las columnas existentes más cualquier otra columna y el total al final (para cálculos).
+    # Los estados sin fichas quedan en 0, así la tabla es int64 y las celdas no necesitan chequear nulos
+    pivot_table = pivot_table.reindex(columns=columnas_ordenadas + otros_cols + ['Total'], fill_value=0)
+
+    # Convertir pivot table a DataFrame para mejor visualización
+    pivot_df = pivot_table.reset_index()
+
+    # Separar las columnas por grupos: tras el reindex todas las columnas de cada grupo existen
+    grupo1_cols = grupo1
+    grupo2_cols = grupo2
+    grupo3_cols = grupo3
+
+    # Generar tabla HTML principal
+    html_table_main = f"""
+            <div style="overflow-x: auto; margin-bottom: 20px;">
+                <table class="styled-table">
+                    <thead>
+                        <tr>
+                            <th rowspan="2">PROGRAMA</th>
+                            <th colspan="{len(grupo1_cols)}" style="background-color: var(--color-primary); border-right: 2px solid white;">Beneficiarios EL (Entrenamiento Laboral)</th>
+                            <th colspan="{len(grupo2_cols)}" style="background-color: var(--color-secondary); border-right: 2px solid white;">Beneficiarios CTI (Contratados)</th>
+                            <th rowspan="2" style="background-color: #e6f0f7; color: #333;">Totales Beneficiario</th>
+                        </tr>
+                        <tr>
+            """
+
+    # Agregar las cabeceras de columnas para la tabla principal
+    cabeceras_main = []
+    for col in grupo1_cols + grupo2_cols:
+        # Determinar el estilo según el grupo
+        if col == "BENEFICIARIO":
+            style = 'style="background-color: #0066a0; color: white;"'
+        elif col == "BENEFICIARIO- CTI":
+            style = 'style="background-color: #0080b3; color: white;"'
+        elif col in grupo1:
+            style = 'style="background-color: var(--color-primary);"'
+        elif col in grupo2:
+            style = 'style="background-color: var(--color-secondary);"'
+        else:
+            style = 'style="background-color: var(--color-accent-2);"'
+
+        # Agregar el tooltip si existe para este estado
+        tooltip = ESTADO_TOOLTIPS.get(col, "")
+        if tooltip:
+            cabeceras_main.append(f'<th {style} title="{tooltip}">{col}</th>')
+        else:
+            cabeceras_main.append(f'<th {style}>{col}</th>')
+    html_table_main += "".join(cabeceras_main)
+
+    html_table_main += """
+                        </tr>
+                    </thead>
+                    <tbody>
+            """
+
+    # Agregar filas de datos para la tabla principal. Los valores se leen como arrays
+    # (sin iterrows) y las filas se arman como fragmentos que se unen una sola vez
+    columnas_main = grupo1_cols + grupo2_cols
+    programas_pivot = pivot_df['PROGRAMA'].to_numpy()
+    valores_main = pivot_df[columnas_main].to_numpy(dtype=np.int64)
+    subtotales = np.zeros(len(pivot_df), dtype=np.int64)
+    for col in ESTADOS_BENEFICIARIO:
+        if col in pivot_df.columns:
+            subtotales += pivot_df[col].to_numpy(dtype=np.int64)
+
+    # Estilo de cada columna para filas comunes y para la fila Total
+    # (se destacan las celdas de BENEFICIARIO y BENEFICIARIO- CTI)
+    estilos_fila = [
+        'style="background-color: #e6f0f7; color: #333; text-align: right;"' if col in ESTADOS_BENEFICIARIO
+        else 'style="color: #333; text-align: right;"'
+        for col in columnas_main
+    ]
+    estilos_fila_total = [
+        'style="font-weight: bold; background-color: #e6f0f7; color: #333; text-align: right;"' if col in ESTADOS_BENEFICIARIO
+        else 'style="font-weight: bold; background-color: #f2f2f2; color: #333; text-align: right;"'
+        for col in columnas_main
+    ]
+    estilo_subtotal = 'style="background-color: #e6f0f7; color: #333; text-align: right; font-weight: bold;"'
+
+    filas_main = []
+    for programa, valores, subtotal in zip(programas_pivot, valores_main, subtotales):
+        if programa == 'Total':
+            celda_programa = f'<td style="font-weight: bold; background-color: #f2f2f2; color: #333;">{programa}</td>'
+            estilos = estilos_fila_total
+        else:
+            celda_programa = f'<td style="color: #333;">{programa}</td>'
+            estilos = estilos_fila
+        celdas = "".join(f'<td {estilo}>{formato_miles(valor)}</td>' for estilo, valor in zip(estilos, valores))
+        filas_main.append(f'<tr>{celda_programa}{celdas}<td {estilo_subtotal}>{formato_miles(subtotal)}</td></tr>')
+    html_table_main += "".join(filas_main)
+
+    html_table_main += """
+                    </tbody>
+                </table>
+            </div>
+            """
+
+    # Tabla del grupo 3 y otros (se muestra dentro de un desplegable)
+    html_table_grupo3 = None
+    if grupo3_cols or otros_cols:
+        # Generar tabla HTML secundaria para grupo 3 y otros
+        html_table_grupo3 = """
+                    <div style="overflow-x: auto; margin-bottom: 20px;">
+                        <table class="styled-table">
+                            <thead>
+                                <tr>
+                                    <th>PROGRAMA</th>
+                    """
+
+        # Agregar cabeceras para el grupo 3
+        style = 'style="background-color: var(--color-accent-3);"'
+        html_table_grupo3 += "".join(f'<th {style}>{col}</th>' for col in grupo3_cols)
+
+        # Agregar cabeceras para otros
+        if otros_cols:
+            otros_nombres = ", ".join(otros_cols)
+            html_table_grupo3 += f'<th colspan="{len(otros_cols)}" style="background-color: var(--color-accent-2);">Otros (Estados: {otros_nombres})</th>'
+
+        # Si hay columnas en "otros", agregar una segunda fila para los nombres específicos
+        if otros_cols:
+            html_table_grupo3 += """
+                                </tr>
+                                <tr>
+                                    <th></th>
+                        """
+            # Agregar los nombres de cada estado en "otros"
+            html_table_grupo3 += "<th></th>" * len(grupo3_cols)
+
+            style = 'style="background-color: var(--color-accent-2);"'
+            html_table_grupo3 += "".join(f'<th {style}>{col}</th>' for col in otros_cols)
+
+        html_table_grupo3 += """
+                                </tr>
+                            </thead>
+                            <tbody>
+                    """
+
+        # Agregar filas de datos para la tabla del grupo 3 y otros (sin la fila Total),
+        # leyendo los valores como arrays y uniendo los fragmentos una sola vez
+        cell_style = 'style="text-align: right;"'
+        valores_grupo3 = pivot_df[grupo3_cols + otros_cols].to_numpy(dtype=np.int64)
+        filas_grupo3 = []
+        for programa, valores in zip(programas_pivot, valores_grupo3):
+            if programa != 'Total':
+                celdas = "".join(f'<td {cell_style}>{formato_miles(valor)}</td>' for valor in valores)
+                filas_grupo3.append(f'<tr><td>{programa}</td>{celdas}</tr>')
+        html_table_grupo3 += "".join(filas_grupo3)
+
+        html_table_grupo3 += """
+                            </tbody>
+                        </table>
+                    </div>
+                    """
+
+    return html_table_main, html_table_grupo3
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _build_choropleth(df_mapa_records, geojson_key, _geojson_dict):
+    """
+    Construye el mapa coroplético de beneficiarios por departamento.
+    Se cachea como recurso para no regenerar la figura (ni reserializar el GeoJSON)
+    en cada rerun cuando los datos no cambiaron. Hay una entrada por combinación de
+    filtros, compartida entre sesiones: max_entries acota cuántas figuras se retienen. La figura solo lleva las features de
+    los departamentos con datos (las demás no se dibujan), así el JSON que se envía al
+    navegador en cada rerun no arrastra la capa completa.
+    
+    Args:
+        df_mapa_records (tuple): Filas (ID_DEPARTAMENTO_GOB, N_DEPARTAMENTO, BENEFICIARIO,
+            BENEFICIARIO- CTI, Total) del conteo por departamento
+        geojson_key (tuple): Códigos CODDEPTO de la capa, usados como clave de caché
+        _geojson_dict (dict): Diccionario GeoJSON normalizado (no se hashea)
+    Returns:
+        plotly.graph_objects.Figure: Figura del mapa
+    """
+    df_mapa_geo = pd.DataFrame(
+        list(df_mapa_records),
+        columns=['ID_DEPARTAMENTO_GOB', 'N_DEPARTAMENTO', 'BENEFICIARIO', 'BENEFICIARIO- CTI', 'Total']
+    )
+    ids_departamento = set(df_mapa_geo['ID_DEPARTAMENTO_GOB'])
+    geojson_mapa = {
+        'type': 'FeatureCollection',
+        'features': [f for f in _geojson_dict['features'] if f['properties'].get('CODDEPTO') in ids_departamento]
+    }
+    fig = px.choropleth_mapbox(
+        df_mapa_geo,
+        geojson=geojson_mapa,
+        locations='ID_DEPARTAMENTO_GOB',
+        color='Total',
+        featureidkey="properties.CODDEPTO",
+        hover_data=['N_DEPARTAMENTO', 'BENEFICIARIO', 'BENEFICIARIO- CTI', 'Total'],
+        center={"lat": -31.4, "lon": -64.2},
+        zoom=6,
+        opacity=0.7,
+        mapbox_style="carto-positron",
+        color_continuous_scale="Blues",
+        labels={'Total': 'Beneficiarios'},
+        title="Distribución de Beneficiarios"
+    )
+    
+    fig.update_layout(
+        margin={"r":0,"t":50,"l":0,"b":0},
+        coloraxis_colorbar={
+            "title": "Cantidad",
+            "tickformat": ",d"
+        },
+        title={
+            'text': "Beneficiarios por Departamento",
+            'y':0.97,
+            'x':0.5,
+            'xanchor': 'center',
+            'yanchor': 'top'
+        },
+        height=400
+    )
+    return fig
+
+
+def _clave_datos(huella, df, columnas=None):
+    """
+    Clave de caché para las tablas derivadas de los datos de empleo: la huella de los
+    datos (ver _huella_datos) cuando existe, calculada una vez por rerun para todas las
+    vistas. Sin huella se usa la forma más el hash del contenido.
+    
+    Args:
+        huella (tuple | None): Huella de la versión de los datos
+        df (pd.DataFrame): DataFrame del que se deriva la tabla
+        columnas (list, optional): Columnas a hashear cuando no hay huella
+    Returns:
+        tuple: Clave hashable
+    """
+    if huella is not None:
+        return huella
+    if columnas is not None:
+        df = df[columnas]
+    return (df.shape, int(pd.util.hash_pandas_object(df, index=False).sum()))
+
+
+@st.cache_data(show_spinner=False, max_entries=2, ttl=1800)
+def _build_actividad_fig(clave, _df):
+    """
+    Construye el gráfico de torta de empresas por actividad principal (Top 10).
+    
+    Args:
+        clave (tuple): Clave de caché de los datos (ver _clave_datos)
+        _df (pd.DataFrame): Perfil de demanda con N_CATEGORIA_EMPLEO y CUIT (no se hashea)
+    Returns:
+        plotly.graph_objects.Figure: Figura del gráfico
+    """
+    # CUITs únicos por actividad: drop_duplicates + size evita armar un set por grupo
+    df_actividad = (_df[['N_CATEGORIA_EMPLEO', 'CUIT']]
+                    .drop_duplicates()
+                    .groupby('N_CATEGORIA_EMPLEO', observed=True).size()
+                    .nlargest(10)
+                    .reset_index())
+    df_actividad.columns = ['Actividad Principal', 'Cantidad de Empresas']
+    
+    fig_actividad = px.pie(
+        df_actividad, 
+        names='Actividad Principal', 
+        values='Cantidad de Empresas',
+        title='Distribución por Actividad Principal (Top 10)',
+        color_discrete_sequence=px.colors.qualitative.Pastel
+    )
+    fig_actividad.update_layout(showlegend=True, title_x=0.5)
+    return fig_actividad
+
+
+@st.cache_data(show_spinner=False, max_entries=2, ttl=1800)
+def _top10_puestos(clave, _df):
+    """
+    Calcula los 10 puestos con más empresas (CUITs únicos).
+    
+    Args:
+        clave (tuple): Clave de caché de los datos (ver _clave_datos)
+        _df (pd.DataFrame): Perfil de demanda con N_PUESTO_EMPLEO y CUIT (no se hashea)
+    Returns:
+        tuple: (puestos, cantidades) como tuplas, de mayor a menor
+    """
+    # CUITs únicos por puesto: drop_duplicates + size en lugar de nunique, y nlargest en lugar de ordenar todo
+    top_10 = (_df[['N_PUESTO_EMPLEO', 'CUIT']]
+              .drop_duplicates()
+              .groupby('N_PUESTO_EMPLEO', observed=True).size()
+              .nlargest(10))
+    return tuple(str(puesto) for puesto in top_10.index), tuple(int(cantidad) for cantidad in top_10.to_numpy())
+
+
+def _build_top10_categorias_fig(df, huella=None):
+    """
+    Devuelve el gráfico de barras de los 10 puestos con más empresas (CUITs únicos).
+    La figura (layout y estilo) se arma una sola vez por sesión; en cada rerun solo se
+    actualizan los datos de la traza.
+    
+    Args:
+        df (pd.DataFrame): Perfil de demanda con N_PUESTO_EMPLEO y CUIT
+        huella (tuple | None): Huella de la versión de los datos, clave del caché
+    Returns:
+        plotly.graph_objects.Figure: Figura del gráfico
+    """
+    fig_bar = safe_session_get('fig_bar_demanda')
+    if fig_bar is None:
+        fig_bar = go.Figure(go.Bar(
+            orientation='h',
+            marker_color=px.colors.qualitative.Vivid[0],
+            hovertemplate='Nº de Empresas (CUITs únicos)=%{x}<br>Puesto de Empleo=%{y}<extra></extra>'
+        ))
+        fig_bar.update_layout(
+            title='Top 10 Puestos por Empresas (CUITs únicos)',
+            xaxis_title='Nº de Empresas (CUITs únicos)',
+            yaxis_title='Puesto de Empleo',
+            yaxis={'categoryorder':'array'},
+            title_x=0.5
+        )
+        safe_session_set('fig_bar_demanda', fig_bar)
+    
+    # Los datos ya vienen ordenados: se envían de menor a mayor (el mayor queda arriba)
+    # con el orden explícito, así Plotly no reordena las categorías en el navegador
+    puestos, cantidades = _top10_puestos(_clave_datos(huella, df), df)
+    puestos, cantidades = puestos[::-1], cantidades[::-1]
+    fig_bar.data[0].update(x=cantidades, y=puestos)
+    fig_bar.update_layout(yaxis_categoryarray=puestos)
+    return fig_bar
+
+
 def create_empleo_kpis(resultados, programa_nombre=""):
     """
     Crea los KPIs específicos para el módulo Programas de Empleo.
@@ -28,32 +850,61 @@ def create_empleo_kpis(resultados, programa_nombre=""):
     Returns:
         list: Lista de diccionarios con datos de KPI para Programas de Empleo
     """
+    # Los KPIs dependen solo de los totales: se memorizan por (totales, programa) para no
+    # rearmarlos al volver a un programa ya visto. El caché guarda tuplas inmutables y cada
+    # llamada recibe diccionarios nuevos, así quien los modifique no altera el caché
+    return [dict(kpi) for kpi in _empleo_kpis(tuple(sorted(resultados.items())), programa_nombre)]
+
+
+@functools.lru_cache(maxsize=32)
+def _empleo_kpis(resultados_items, programa_nombre):
+    """
+    Arma los KPIs de Programas de Empleo a partir de los totales como tupla (hasheable).
+    
+    Args:
+        resultados_items (tuple): Pares (clave, total) ordenados por clave
+        programa_nombre (str): Nombre del programa seleccionado para mostrar en los títulos
+    Returns:
+        tuple: Un KPI por elemento, cada uno como tupla de pares (campo, valor)
+    """
+    totales = dict(resultados_items)
     kpis = [
         {
             "title": f"TOTAL MATCH {programa_nombre}",
-            "value_form": f"{resultados.get('total_match', 0):,}".replace(',', '.'),
+            "value_form": formato_miles(totales.get('total_match', 0)),
             "color_class": "kpi-primary",
             "delta": "",
             "delta_color": "#d4f7d4"
         },
         {
             "title": f"TOTAL BENEFICIARIOS {programa_nombre}",
-            "value_form": f"{resultados.get('total_benef', 0):,}".replace(',', '.'),
+            "value_form": formato_miles(totales.get('total_benef', 0)),
             "color_class": "kpi-secondary",
             "delta": "",
             "delta_color": "#d4f7d4"
         },
         {
             "title": f"POSTULANTES VALIDADOS",
-            "value_form": f"{resultados.get('total_validos', 0):,}".replace(',', '.'),
+            "value_form": formato_miles(totales.get('total_validos', 0)),
             "color_class": "kpi-accent-1",
             "delta": "",
             "delta_color": "#d4f7d4"
         }
     ]
-    return kpis
+    return tuple(tuple(kpi.items()) for kpi in kpis)
 
 def calculate_cupo(cantidad_empleados, empleador, adherido):
+    """
+    Calcula el cupo de una sola empresa. Es la referencia escalar de las reglas: para columnas
+    completas usar calculate_cupo_vectorized, que evita el apply fila por fila.
+    
+    Args:
+        cantidad_empleados (int): Cantidad de empleados de la empresa
+        empleador (str): Indicador EMPLEADOR ('S'/'N')
+        adherido (str): Programa al que adhiere la empresa
+    Returns:
+        int: Cupo de la empresa (None en el tramo PPP de 11 a 25 empleados)
+    """
     # Condición para el programa PPP
     if adherido == "PPP - PROGRAMA PRIMER PASO [2024]":
         if cantidad_empleados < 1:
@@ -86,32 +937,91 @@ def calculate_cupo(cantidad_empleados, empleador, adherido):
     
     return 0
 
+# Tramos de cupo por cantidad de empleados: (límites superiores inclusive, valor fijo, tasa).
+# El tramo PPP de 11 a 25 empleados no define cupo (NaN), igual que calculate_cupo
+CUPO_TRAMOS_PPP = (
+    np.array([5, 10, 25, 50]),
+    np.array([1, 2, np.nan, np.nan, np.nan]),
+    np.array([np.nan, np.nan, np.nan, 0.2, 0.1]),
+)
+CUPO_TRAMOS_EMPLEO_26 = (
+    np.array([7, 30, 165]),
+    np.array([2, np.nan, np.nan, np.nan]),
+    np.array([np.nan, 0.2, 0.15, 0.1]),
+)
+
+
+def calculate_cupo_vectorized(cantidad_empleados, empleador, adherido):
+    """
+    Versión vectorizada de calculate_cupo: aplica las mismas reglas sobre columnas completas.
+    
+    Args:
+        cantidad_empleados (pd.Series): Cantidad de empleados por fila
+        empleador (pd.Series): Indicador EMPLEADOR ('S'/'N')
+        adherido (pd.Series): Programa al que adhiere la fila
+    Returns:
+        np.ndarray: Cupo por fila (NaN en el tramo PPP de 11 a 25 empleados, igual que calculate_cupo)
+    """
+    n = pd.to_numeric(cantidad_empleados, errors='coerce').to_numpy(dtype=float)
+    es_ppp = (adherido == "PPP - PROGRAMA PRIMER PASO [2024]").to_numpy(dtype=bool)
+    es_e26 = adherido.isin(ADHERIDO_EMPLEO_26).to_numpy(dtype=bool)
+    no_empleador = (empleador == 'N').to_numpy(dtype=bool)
+
+    cupo_ppp = _cupo_por_tramo(n, *CUPO_TRAMOS_PPP)
+    cupo_ppp[n < 1] = 0
+
+    cupo_e26 = _cupo_por_tramo(n, *CUPO_TRAMOS_EMPLEO_26)
+    cupo_e26[(n < 1) | no_empleador] = 1
+
+    return np.select([es_ppp, es_e26], [cupo_ppp, cupo_e26], default=0)
+
+
+def _cupo_por_tramo(n, limites, fijos, tasas):
+    """
+    Calcula el cupo según el tramo de cantidad de empleados: cada tramo tiene un valor fijo
+    o una tasa que se aplica como ceil(tasa * n). El tramo se busca con np.searchsorted.
+    
+    Args:
+        n (np.ndarray): Cantidad de empleados
+        limites (np.ndarray): Límite superior (inclusive) de cada tramo salvo el último
+        fijos (np.ndarray): Valor fijo por tramo (NaN si el tramo usa tasa)
+        tasas (np.ndarray): Tasa por tramo (NaN si el tramo usa valor fijo)
+    Returns:
+        np.ndarray: Cupo por fila (float, NaN donde el tramo no define cupo)
+    """
+    tramo = np.searchsorted(limites, n, side='left')
+    tasa = tasas[tramo]
+    return np.where(np.isnan(tasa), fijos[tramo], np.ceil(tasa * n))
+
 def render_tab_filters(df, key_prefix):
     """
     Renderiza los filtros para una pestaña específica y devuelve el DataFrame filtrado.
     """
-    df_filtered = df.copy()
+    # Los filtros se combinan en una sola máscara y se indexa una vez al final;
+    # sin filtros se devuelve el mismo DataFrame (el resultado solo se lee, no hace falta copiar)
+    mask = None
     filtros_aplicados = []
 
     col1, col2 = st.columns(2)
 
     with col1:
         if 'N_DEPARTAMENTO' in df.columns:
-            departamentos = sorted(df['N_DEPARTAMENTO'].dropna().unique())
+            departamentos = valores_ordenados(df['N_DEPARTAMENTO'])
             all_dpto_option = "Todos los departamentos"
             selected_dpto = st.selectbox("Departamento:", [all_dpto_option] + departamentos, key=f"{key_prefix}_dpto")
 
             if selected_dpto != all_dpto_option:
-                df_filtered = df_filtered[df_filtered['N_DEPARTAMENTO'] == selected_dpto]
+                mask = df['N_DEPARTAMENTO'] == selected_dpto
                 filtros_aplicados.append(f"Departamento: {selected_dpto}")
 
     with col2:
         if 'ZONA' in df.columns:
-            zonas = sorted(df['ZONA'].dropna().unique())
+            zonas = valores_ordenados(df['ZONA'])
             all_zona_option = "Todas las zonas"
             selected_zona = st.selectbox("Zona:", [all_zona_option] + zonas, key=f"{key_prefix}_zona")
             if selected_zona != all_zona_option:
-                df_filtered = df_filtered[df_filtered['ZONA'] == selected_zona]
+                mask_zona = df['ZONA'] == selected_zona
+                mask = mask_zona if mask is None else mask & mask_zona
                 filtros_aplicados.append(f"Zona: {selected_zona}")
 
     if filtros_aplicados:
@@ -119,7 +1029,7 @@ def render_tab_filters(df, key_prefix):
     else:
         st.markdown("**Mostrando todos los datos para esta sección**")
 
-    return df_filtered
+    return df if mask is None else df.loc[mask]
 
 def show_empleo_dashboard(data, dates, is_development=False):
     """
@@ -142,32 +1052,97 @@ def show_empleo_dashboard(data, dates, is_development=False):
     geojson_data = data.get('capa_departamentos_2010.geojson')
     df_empresas = data.get('df_empresas.parquet')
 
-    render_dashboard(df_postulantes_empleo, df_inscriptos, df_empresas, geojson_data)
+    # Conversiones de tipos una sola vez antes de renderizar, fuera de cada vista.
+    # Mientras la huella de los datos no cambie, todas las sesiones reutilizan los
+    # DataFrames ya preparados. Se calcula antes de preparar, sobre los datos de origen
+    huella = _huella_datos(dates, (df_postulantes_empleo, df_inscriptos, df_empresas))
+    try:
+        if huella is not None:
+            df_postulantes_empleo, df_inscriptos, df_empresas = _datos_empleo_preparados(
+                huella, df_postulantes_empleo, df_inscriptos, df_empresas
+            )
+        else:
+            df_postulantes_empleo, df_inscriptos, df_empresas = preparar_datos_empleo(
+                df_postulantes_empleo, df_inscriptos, df_empresas
+            )
+    except Exception as e:
+        st.error(f"Error al preparar los datos de Programas de Empleo: {str(e)}")
+        return
+
+    render_dashboard(df_postulantes_empleo, df_inscriptos, df_empresas, geojson_data, huella)
+
+
+# Columnas de inscriptos de las que dependen los KPIs del tablero
+COLUMNAS_KPI_DASHBOARD = ['N_ESTADO_FICHA', 'BEN_N_ESTADO', 'PROGRAMA', 'ZONA']
+
+
+@st.cache_data(show_spinner=False)
+def _kpis_dashboard(df):
+    """
+    Calcula los KPIs del tablero con una sola pasada sobre los códigos categóricos de las
+    columnas que los definen: np.unique cuenta cada combinación de códigos y cada KPI se
+    resuelve sumando esos conteos (unas pocas combinaciones) en lugar de armar máscaras
+    sobre todas las filas. Se cachea para no recalcular en cada rerun.
+    
+    Args:
+        df (pd.DataFrame): Inscriptos con las columnas de COLUMNAS_KPI_DASHBOARD
+    Returns:
+        dict: Valor entero de cada KPI
+    """
+    # Código 0 reservado para nulos; las categorías reales van de 1 en adelante
+    codigos, categorias = [], {}
+    for col in COLUMNAS_KPI_DASHBOARD:
+        serie = df[col].astype('category')
+        codigos.append(serie.cat.codes.to_numpy(dtype=np.int64) + 1)
+        categorias[col] = serie.cat.categories
+    dims = tuple(len(categorias[col]) + 1 for col in COLUMNAS_KPI_DASHBOARD)
+    claves, cantidad = np.unique(np.ravel_multi_index(codigos, dims), return_counts=True)
+    combinaciones = dict(zip(COLUMNAS_KPI_DASHBOARD, np.unravel_index(claves, dims)))
+    
+    def en(col, valores):
+        # Pertenencia evaluada sobre las categorías y leída por código para cada combinación
+        por_categoria = np.concatenate(([False], categorias[col].isin(valores)))
+        return por_categoria[combinaciones[col]]
+    
+    def contar(mask):
+        return int(cantidad[mask].sum())
+    
+    beneficiario_activo = en('BEN_N_ESTADO', BEN_ESTADOS_ACTIVOS)
+    es_cti = en('N_ESTADO_FICHA', ["BENEFICIARIO- CTI"])
+    es_inscripto = en('N_ESTADO_FICHA', ["INSCRIPTO"])
+    es_e26_2025 = en('PROGRAMA', ["Más 26 [2025]"])
+    
+    return {
+        'total_beneficiarios': contar(beneficiario_activo),
+        'total_beneficiarios_fin': contar(en('BEN_N_ESTADO', ["BAJA POR FINALIZACION DE PROGRAMA"])),
+        'total_beneficiarios_cti': contar(es_cti),
+        'total_match_e26_2025': contar(es_inscripto & es_e26_2025),
+        'total_match_ppp_2025': contar(es_inscripto & en('PROGRAMA', ["Programa Primer Paso [2025]"])),
+        'beneficiarios_zona_favorecida': contar((es_cti | beneficiario_activo) & en('ZONA', [ZONA_FAVORECIDA])),
+        'beneficiarios_e26_2025': contar(
+            es_e26_2025 &
+            en('N_ESTADO_FICHA', ["BENEFICIARIO"]) &
+            en('BEN_N_ESTADO', ["ACTIVO"])
+        ),
+    }
 
-def render_dashboard(df_postulantes_empleo,df_inscriptos, df_empresas, geojson_data):
+
+def render_dashboard(df_postulantes_empleo,df_inscriptos, df_empresas, geojson_data, huella=None):
     """
     Renderiza el dashboard principal con los datos procesados.
+    huella identifica la versión de los datos y es la clave de los cachés de las vistas.
     """
     with st.spinner("Generando visualizaciones..."):
-        # Calcular KPIs importantes antes de aplicar filtros
-        total_beneficiarios = df_inscriptos[df_inscriptos['BEN_N_ESTADO'].isin(["BENEFICIARIO RETENIDO", "ACTIVO", "BAJA PEDIDO POR EMPRESA"])].shape[0]
-        total_beneficiarios_fin = df_inscriptos[df_inscriptos['BEN_N_ESTADO'].isin(["BAJA POR FINALIZACION DE PROGRAMA"])].shape[0]
-        total_beneficiarios_cti = df_inscriptos[df_inscriptos['N_ESTADO_FICHA'] == "BENEFICIARIO- CTI"].shape[0]
-        total_match_e26_2025 = df_inscriptos[(df_inscriptos['N_ESTADO_FICHA'] == "INSCRIPTO") & (df_inscriptos['PROGRAMA'] == "Más 26 [2025]")].shape[0]
-        total_match_ppp_2025 = df_inscriptos[(df_inscriptos['N_ESTADO_FICHA'] == "INSCRIPTO") & (df_inscriptos['PROGRAMA'] == "Programa Primer Paso [2025]")].shape[0]
+        # Calcular KPIs importantes antes de aplicar filtros (un solo groupby cacheado)
+        kpis = _kpis_dashboard(df_inscriptos[COLUMNAS_KPI_DASHBOARD])
+        total_beneficiarios = kpis['total_beneficiarios']
+        total_beneficiarios_fin = kpis['total_beneficiarios_fin']
+        total_beneficiarios_cti = kpis['total_beneficiarios_cti']
+        total_match_e26_2025 = kpis['total_match_e26_2025']
+        total_match_ppp_2025 = kpis['total_match_ppp_2025']
         total_general = total_beneficiarios + total_beneficiarios_cti
-        
-        # Calcular beneficiarios por zona
-        beneficiarios_zona_favorecida = df_inscriptos[((df_inscriptos['N_ESTADO_FICHA'].isin(["BENEFICIARIO- CTI"])) | 
-                                        (df_inscriptos['BEN_N_ESTADO'].isin(["BENEFICIARIO RETENIDO", "ACTIVO", "BAJA PEDIDO POR EMPRESA"])))&
-                                        (df_inscriptos['ZONA'] == 'ZONA NOC Y SUR')].shape[0]
-        
-        # Calcular total de beneficiarios Empleo+26 2025
-        beneficiarios_e26_2025 = df_inscriptos[
-            (df_inscriptos['PROGRAMA'] == "Más 26 [2025]") & 
-            (df_inscriptos['N_ESTADO_FICHA'] == "BENEFICIARIO") &
-            (df_inscriptos['BEN_N_ESTADO'] == "ACTIVO")
-        ].shape[0]
+        beneficiarios_zona_favorecida = kpis['beneficiarios_zona_favorecida']
+        beneficiarios_e26_2025 = kpis['beneficiarios_e26_2025']
         
         # Mostrar KPIs en dos filas para mejor distribución visual
         st.markdown('<div class="kpi-section">', unsafe_allow_html=True)
@@ -176,25 +1151,25 @@ def render_dashboard(df_postulantes_empleo,df_inscriptos, df_empresas, geojson_d
         kpi_data_row1 = [
             {
                 "title": "TOTAL MATCH PPP 2025",
-                "value_form": f"{total_match_ppp_2025:,}".replace(',', '.'),
+                "value_form": formato_miles(total_match_ppp_2025),
                 "color_class": "kpi-accent-5",
                 "tooltip": TOOLTIPS_DESCRIPTIVOS.get("TOTAL MATCH PPP 2025", "")
             },
             {
                 "title": "TOTAL MATCH E26 2025",
-                "value_form": f"{total_match_e26_2025:,}".replace(',', '.'),
+                "value_form": formato_miles(total_match_e26_2025),
                 "color_class": "kpi-accent-5",
                 "tooltip": TOOLTIPS_DESCRIPTIVOS.get("TOTAL MATCH E26 2025", "")
             },
             {
                 "title": "BENEFICIARIOS TOTALES (activos)",
-                "value_form": f"{total_general:,}".replace(',', '.'),
+                "value_form": formato_miles(total_general),
                 "color_class": "kpi-primary",
                 "tooltip": TOOLTIPS_DESCRIPTIVOS.get("BENEFICIARIOS TOTALES", "")
             },
             {
                 "title": "BENEFICIARIOS E26 2025 (activos)",
-                "value_form": f"{beneficiarios_e26_2025:,}".replace(',', '.'),
+                "value_form": formato_miles(beneficiarios_e26_2025),
                 "color_class": "kpi-accent-2",
                 "tooltip": "Total de beneficiarios activos del programa Empleo+26 2025"
             }
@@ -209,73 +1184,106 @@ def render_dashboard(df_postulantes_empleo,df_inscriptos, df_empresas, geojson_d
         kpi_data_row2 = [
             {
                 "title": "BENEFICIARIOS EL (activos)",
-                "value_form": f"{total_beneficiarios:,}".replace(',', '.'),
+                "value_form": formato_miles(total_beneficiarios),
                 "color_class": "kpi-secondary",
                 "tooltip": TOOLTIPS_DESCRIPTIVOS.get("BENEFICIARIOS EL", "")
             },
             {
                 "title": "BENEFICIARIOS CTI (activos)",
-                "value_form": f"{total_beneficiarios_cti:,}".replace(',', '.'),
+                "value_form": formato_miles(total_beneficiarios_cti),
                 "color_class": "kpi-accent-4",
                 "tooltip": TOOLTIPS_DESCRIPTIVOS.get("BENEFICIARIOS CTI", "")
             },
             {
                 "title": "ZONA FAVORECIDA (activos)",
-                "value_form": f"{beneficiarios_zona_favorecida:,}".replace(',', '.'),
+                "value_form": formato_miles(beneficiarios_zona_favorecida),
                 "color_class": "kpi-accent-3",
                 "tooltip": TOOLTIPS_DESCRIPTIVOS.get("ZONA FAVORECIDA", "")
             },
             
             {
                 "title": "BENEFICIARIOS COMPLETARON PROGRAMA",
-                "value_form": f"{total_beneficiarios_fin:,}".replace(',', '.'),
+                "value_form": formato_miles(total_beneficiarios_fin),
                 "color_class": "kpi-accent-1",
                 "tooltip": TOOLTIPS_DESCRIPTIVOS.get("BENEFICIARIOS FIN", "")
             }
         ]
         
         display_kpi_row(kpi_data_row2, num_columns=4)
-        st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown(_HTML_CIERRE_DIV, unsafe_allow_html=True)
         
 
-        tabs = st.tabs(["Postulantes", "Inscriptos y Beneficiarios", "Empresas"])
-        tab_postulantes = tabs[0]
-        tab_beneficiarios = tabs[1]
-        tab_empresas = tabs[2]
+        # Selector de sección en lugar de st.tabs: st.tabs ejecuta el contenido de todas las
+        # pestañas en cada rerun, con el selector solo se calcula la sección visible. Un radio
+        # no se puede deseleccionar, así que siempre hay una sola sección marcada y es la que
+        # se muestra
+        secciones = ["Postulantes", "Inscriptos y Beneficiarios", "Empresas"]
+        seccion = st.radio(
+            "Sección",
+            secciones,
+            index=0,
+            horizontal=True,
+            key="empleo_seccion",
+            label_visibility="collapsed"
+        )
             
-            # Pestaña de postulantes
-        with tab_postulantes:
-            show_postulantes(df_postulantes_empleo)
+        # Pestaña de postulantes
+        if seccion == "Postulantes":
+            show_postulantes(df_postulantes_empleo, huella)
         
         # Contenido de la pestaña Beneficiarios
-        with tab_beneficiarios:
+        elif seccion == "Inscriptos y Beneficiarios":
             show_inscriptions(df_inscriptos, geojson_data)
         
-        with tab_empresas:
+        elif seccion == "Empresas":
         
             st.markdown('<div class="section-title">Empresas adheridas en todos los programas de la gestión</div>', unsafe_allow_html=True)
 
-            show_companies(df_empresas)
+            show_companies(df_empresas, huella)
+
+
+@st.cache_data(show_spinner=False, max_entries=2, ttl=1800)
+def _localidades_por_departamento(clave, _df):
+    """
+    Arma una sola vez las opciones del filtro de localidad: las localidades de cada
+    departamento y la lista completa, ordenadas como en el selectbox.
+    
+    Args:
+        clave (tuple): Clave de caché de los datos (ver _clave_datos)
+        _df (pd.DataFrame): Postulantes con N_LOCALIDAD (y N_DEPARTAMENTO si existe); no se hashea
+    Returns:
+        tuple: (dict departamento -> tupla de localidades, tupla con todas las localidades)
+    """
+    por_departamento = {}
+    if 'N_DEPARTAMENTO' in _df.columns:
+        pares = _df[['N_DEPARTAMENTO', 'N_LOCALIDAD']].dropna().drop_duplicates()
+        por_departamento = {
+            departamento: tuple(sorted(localidades))
+            for departamento, localidades in pares.groupby('N_DEPARTAMENTO', observed=True)['N_LOCALIDAD']
+        }
+    return por_departamento, tuple(valores_ordenados(_df['N_LOCALIDAD']))
+
             
-def show_postulantes(df_postulantes_empleo):
+def show_postulantes(df_postulantes_empleo, huella=None):
     """
     Display postulantes dashboard with filters, KPIs, and visualizations.
     
     Args:
         df_postulantes_empleo (pd.DataFrame): DataFrame containing postulantes data
+        huella (tuple | None): Data version fingerprint, used as cache key
     """
     try:
         st.markdown('<div class="section-title">Postulantes EMPLEO +26 y PPP [2025]</div>', unsafe_allow_html=True)
             
         # Filtros visuales en dos columnas
-        st.markdown('<div class="filter-section">', unsafe_allow_html=True)
+        st.markdown(_HTML_FILTER_SECTION, unsafe_allow_html=True)
         col_filtro1, col_filtro2, col_filtro3 = st.columns(3)
         
         # Primera columna: filtro de departamento
         with col_filtro1:
             st.markdown('<div class="filter-label">Departamento:</div>', unsafe_allow_html=True)
             if 'N_DEPARTAMENTO' in df_postulantes_empleo.columns:
-                departamentos = sorted(df_postulantes_empleo['N_DEPARTAMENTO'].dropna().unique())
+                departamentos = valores_ordenados(df_postulantes_empleo['N_DEPARTAMENTO'])
                 selected_dpto = st.selectbox(
                     "Seleccionar departamento",
                     options=["Todos los departamentos"] + departamentos,
@@ -288,8 +1296,13 @@ def show_postulantes(df_postulantes_empleo):
         # Segunda columna: filtro de localidad dependiente del departamento
         with col_filtro2:
             st.markdown('<div class="filter-label">Localidad:</div>', unsafe_allow_html=True)
+            if 'N_LOCALIDAD' in df_postulantes_empleo.columns:
+                # Opciones precalculadas (cacheadas): no se escanea el DataFrame en cada cambio de departamento
+                columnas_localidad = [col for col in ('N_DEPARTAMENTO', 'N_LOCALIDAD') if col in df_postulantes_empleo.columns]
+                localidades_por_dpto, todas_localidades = _localidades_por_departamento(
+                    _clave_datos(huella, df_postulantes_empleo, columnas_localidad), df_postulantes_empleo)
             if selected_dpto != "Todos los departamentos" and 'N_LOCALIDAD' in df_postulantes_empleo.columns:
-                localidades = sorted(df_postulantes_empleo[df_postulantes_empleo['N_DEPARTAMENTO'] == selected_dpto]['N_LOCALIDAD'].dropna().unique())
+                localidades = list(localidades_por_dpto.get(selected_dpto, ()))
                 selected_loc = st.selectbox(
                     "Seleccionar localidad",
                     options=["Todas las localidades"] + localidades,
@@ -297,7 +1310,7 @@ def show_postulantes(df_postulantes_empleo):
                     key="postulantes_loc"
                 )
             elif 'N_LOCALIDAD' in df_postulantes_empleo.columns:
-                localidades = sorted(df_postulantes_empleo['N_LOCALIDAD'].dropna().unique())
+                localidades = list(todas_localidades)
                 selected_loc = st.selectbox(
                     "Seleccionar localidad",
                     options=["Todas las localidades"] + localidades,
@@ -311,7 +1324,7 @@ def show_postulantes(df_postulantes_empleo):
         with col_filtro3:
             st.markdown('<div class="filter-label">Programa:</div>', unsafe_allow_html=True)
             if 'DENOM_PROG' in df_postulantes_empleo.columns:
-                programas = sorted(df_postulantes_empleo['DENOM_PROG'].dropna().unique())
+                programas = valores_ordenados(df_postulantes_empleo['DENOM_PROG'])
                 selected_prog = st.selectbox(
                     "Seleccionar programa",
                     options=["Todos los programas"] + programas,
@@ -321,16 +1334,18 @@ def show_postulantes(df_postulantes_empleo):
             else:
                 selected_prog = "Todos los programas"
 
-        st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown(_HTML_CIERRE_DIV, unsafe_allow_html=True)
 
-        # Aplicar filtros al DataFrame
-        df_filtrado = df_postulantes_empleo.copy()
+        # Aplicar filtros al DataFrame: se combinan en una sola máscara y se indexa una vez
+        # (solo lectura; sin filtros se usa el mismo DataFrame)
+        mask = np.ones(len(df_postulantes_empleo), dtype=bool)
         if selected_dpto != "Todos los departamentos":
-            df_filtrado = df_filtrado[df_filtrado['N_DEPARTAMENTO'] == selected_dpto]
+            mask &= (df_postulantes_empleo['N_DEPARTAMENTO'] == selected_dpto).to_numpy(dtype=bool)
         if selected_loc != "Todas las localidades":
-            df_filtrado = df_filtrado[df_filtrado['N_LOCALIDAD'] == selected_loc]
-        if selected_prog != "Todos los programas" and 'DENOM_PROG' in df_filtrado.columns:
-            df_filtrado = df_filtrado[df_filtrado['DENOM_PROG'] == selected_prog]
+            mask &= (df_postulantes_empleo['N_LOCALIDAD'] == selected_loc).to_numpy(dtype=bool)
+        if selected_prog != "Todos los programas" and 'DENOM_PROG' in df_postulantes_empleo.columns:
+            mask &= (df_postulantes_empleo['DENOM_PROG'] == selected_prog).to_numpy(dtype=bool)
+        df_filtrado = df_postulantes_empleo if mask.all() else df_postulantes_empleo[mask]
 
        
        
@@ -352,19 +1367,19 @@ def show_postulantes(df_postulantes_empleo):
         kpi_data = [
             {
                 "title": kpi_title,
-                "value_form": f"{total_cuil_unicos:,}".replace(',', '.'),
+                "value_form": formato_miles(total_cuil_unicos),
                 "color_class": "kpi-primary",
                 "tooltip": "Cantidad total de postulantes únicos (basado en CUIL) después de aplicar filtros."
             },
             {
                 "title": "Cantidad CVs Cargados",
-                "value_form": f"{cantidad_cvs:,}".replace(',', '.'),
+                "value_form": formato_miles(cantidad_cvs),
                 "color_class": "kpi-accent-2",
                 "tooltip": "Número de currículums vitae únicos que han sido cargados por los postulantes filtrados."
             },
             {
                 "title": "Empresas Seleccionadas",
-                "value_form": f"{total_empresas_unicas:,}".replace(',', '.'),
+                "value_form": formato_miles(total_empresas_unicas),
                 "color_class": "kpi-accent-1",
                 "tooltip": "Cantidad de empresas únicas (basado en CUIT) seleccionadas por los postulantes."
             }
@@ -395,7 +1410,7 @@ def show_postulantes(df_postulantes_empleo):
         with col_edad:
             st.markdown('<div class="section-title">Distribución por Edades</div>', unsafe_allow_html=True)
             if 'FEC_NACIMIENTO' in df_filtrado.columns and 'CUIL' in df_filtrado.columns:
-                df_edad = df_filtrado[['FEC_NACIMIENTO', 'CUIL']].copy().dropna()
+                df_edad = df_filtrado[['FEC_NACIMIENTO', 'CUIL']].dropna()
                 if not df_edad.empty:
                     today = datetime.date.today()
                     def calcular_edad(fecha_str):
@@ -444,18 +1459,24 @@ def show_postulantes(df_postulantes_empleo):
         if 'CUIT' in df_filtrado.columns and 'N_EMPRESA' in df_filtrado.columns:
             try:
                 # Contar postulantes por empresa
-                # Primero creamos un DataFrame con valores únicos de CUIT y N_EMPRESA
-                df_empresas_unicas = df_filtrado[['CUIT', 'N_EMPRESA']].drop_duplicates()
+                # Primero hacemos el conteo de postulantes por empresa y nos quedamos con el TOP 10
+                # antes de unir, así el merge trabaja sobre 10 filas y no sobre todas las empresas.
+                # Los empates quedan por CUIT ascendente (groupby ordena las claves y nlargest
+                # conserva el primero); observed=True evita filas para categorías sin datos
+                empresas_counts = (df_filtrado.groupby('CUIT', observed=True)['CUIL'].nunique()
+                                   .nlargest(10)
+                                   .rename('Postulantes')
+                                   .reset_index())
                 
-                # Luego hacemos el conteo de postulantes por empresa
-                empresas_counts = df_filtrado.groupby('CUIT', observed=True)['CUIL'].nunique().reset_index()
-                empresas_counts.columns = ['CUIT', 'Postulantes']
-                
-                # Unimos con la información de empresa
+                # Unimos con la información de empresa: los pares únicos CUIT/N_EMPRESA se arman
+                # solo para los CUITs del TOP 10, no para todo el DataFrame filtrado
+                df_empresas_unicas = df_filtrado.loc[
+                    df_filtrado['CUIT'].isin(empresas_counts['CUIT']), ['CUIT', 'N_EMPRESA']
+                ].drop_duplicates()
                 empresas_counts = pd.merge(empresas_counts, df_empresas_unicas, on='CUIT', how='left')
                 
-                # Ordenar y tomar el TOP 10
-                top_empresas = empresas_counts.sort_values('Postulantes', ascending=False).head(10)
+                # Tomar el TOP 10 con selección parcial (un CUIT puede tener más de un N_EMPRESA)
+                top_empresas = empresas_counts.nlargest(10, 'Postulantes')
                 
                 if not top_empresas.empty:
                     fig_empresas = px.bar(
@@ -485,57 +1506,52 @@ def show_postulantes(df_postulantes_empleo):
         st.error(f"Error al mostrar los datos de postulantes: {str(e)}")
         st.info("Por favor, verifica que los datos estén correctamente cargados.")
 
-def show_companies(df_empresas):
-    # Asegúrate de que las columnas numéricas sean del tipo correcto
-    if 'CANTIDAD_EMPLEADOS' in df_empresas.columns:
-        df_empresas['CANTIDAD_EMPLEADOS'] = pd.to_numeric(df_empresas['CANTIDAD_EMPLEADOS'], errors='coerce')
-        df_empresas['CANTIDAD_EMPLEADOS'] = df_empresas['CANTIDAD_EMPLEADOS'].fillna(0)
-    else:
-        df_empresas['CANTIDAD_EMPLEADOS'] = 0
-        
-    if 'VACANTES' in df_empresas.columns:
-        df_empresas['VACANTES'] = pd.to_numeric(df_empresas['VACANTES'], errors='coerce')
-        df_empresas['VACANTES'] = df_empresas['VACANTES'].fillna(0)
-    else:
-        df_empresas['VACANTES'] = 0
+def show_companies(df_empresas, huella=None):
+    # CANTIDAD_EMPLEADOS y VACANTES ya llegan como enteros desde preparar_datos_empleo
+    # (conteos_a_entero): df_empresas es compartido entre sesiones y aquí solo se lee
 
-    # Crear una copia para trabajar
-    df_display = df_empresas.copy()
+    # Una fila por CUIT (la primera, conservando TODAS las columnas). CUPO y ADHERIDO se calculan
+    # directamente sobre las filas únicas; drop_duplicates ya devuelve datos nuevos, así que la
+    # copia superficial solo desliga el resultado de df_empresas (sin SettingWithCopyWarning)
+    df_display = df_empresas.drop_duplicates(subset='CUIT').copy(deep=False)
     
-    # Calcular la columna 'CUPO'
+    # Calcular la columna 'CUPO' (con el programa de la fila conservada, antes de unir los programas)
     if all(col in df_display.columns for col in ['CANTIDAD_EMPLEADOS', 'EMPLEADOR', 'ADHERIDO']):
-        df_display['CUPO'] = df_display.apply(lambda row: calculate_cupo(row['CANTIDAD_EMPLEADOS'], row['EMPLEADOR'], row['ADHERIDO']), axis=1)
+        df_display['CUPO'] = calculate_cupo_vectorized(df_display['CANTIDAD_EMPLEADOS'], df_display['EMPLEADOR'], df_display['ADHERIDO'])
     else:
         df_display['CUPO'] = 0
 
-    # Filtrar por CUIT único y eliminar duplicados - usar TODAS las columnas disponibles
-    columns_to_select = list(df_display.columns)
+    # La lista original de programas de cada fila queda en df_empresas['ADHERIDO'] (solo se
+    # reemplaza en df_display), así que la referenciamos en lugar de copiar la columna
+    programas_lista = df_empresas['ADHERIDO'] if 'ADHERIDO' in df_empresas.columns else None
 
-    if 'CUIT' in df_display.columns and 'ADHERIDO' in df_display.columns:
-        # Guardamos la lista original de programas para cada CUIT antes de agrupar
-        df_display['PROGRAMAS_LISTA'] = df_display['ADHERIDO']
-        df_display['ADHERIDO'] = df_display.groupby('CUIT', observed=True)['ADHERIDO'].transform(lambda x: ', '.join(sorted(set(x))))
+    if 'CUIT' in df_display.columns and programas_lista is not None:
+        # Programas únicos y ordenados por CUIT sin lambda por grupo: drop_duplicates reemplaza al
+        # set y el sort_values previo al sorted. Los pares salen de todas las filas de df_empresas
+        # y el resultado se asigna a cada CUIT con map
+        pares = df_empresas[['CUIT', 'ADHERIDO']].dropna().drop_duplicates().astype({'ADHERIDO': str})
+        programas_por_cuit = pares.sort_values('ADHERIDO').groupby('CUIT', sort=False)['ADHERIDO'].agg(', '.join)
+        df_display['ADHERIDO'] = df_display['CUIT'].map(programas_por_cuit)
     
-    # Usar columns_to_select para crear df_display correctamente (sin duplicar columnas)
-    df_display = df_display[columns_to_select].drop_duplicates(subset='CUIT')
-    df_display = df_display.sort_values(by='CUPO', ascending=False).reset_index(drop=True)
+    df_display = df_display.sort_values(by='CUPO', ascending=False, ignore_index=True)
     
     # Extraer todos los programas únicos para el filtro multiselect
     programas_unicos = []
-    if 'ADHERIDO' in df_display.columns:
-        # Extraer todos los programas únicos de la columna ADHERIDO
-        todos_programas = df_display['ADHERIDO'].str.split(', ').explode().dropna().unique()
-        programas_unicos = sorted(todos_programas)
+    if programas_lista is not None:
+        # df_empresas conserva el programa original de cada fila (sin agrupar por CUIT), así que
+        # no hace falta volver a separar la lista unida con ', ': con ADHERIDO categórica es un
+        # conteo sobre los códigos, sin split ni explode en cada rerun
+        programas_unicos = valores_ordenados(programas_lista)
     
     # Extraer valores únicos para los filtros
-    departamentos_unicos = sorted(df_display['N_DEPARTAMENTO'].dropna().unique()) if 'N_DEPARTAMENTO' in df_display.columns else []
+    departamentos_unicos = valores_ordenados(df_display['N_DEPARTAMENTO']) if 'N_DEPARTAMENTO' in df_display.columns else []
     
     # Usar la columna ZONA existente (ya está en el DataFrame)
     
-    zonas_unicas = sorted(df_display['ZONA'].dropna().unique()) if 'ZONA' in df_display.columns else []
+    zonas_unicas = valores_ordenados(df_display['ZONA']) if 'ZONA' in df_display.columns else []
     
     # Añadir filtros en la pestaña de empresas - 3 filtros en una fila
-    st.markdown('<div class="filter-section">', unsafe_allow_html=True)
+    st.markdown(_HTML_FILTER_SECTION, unsafe_allow_html=True)
     col_filtro1, col_filtro2, col_filtro3 = st.columns(3)
     
     # Filtro 1: Programas
@@ -562,27 +1578,18 @@ def show_companies(df_empresas):
         else:
             selected_zonas = []
     
-    st.markdown('</div>', unsafe_allow_html=True)
+    st.markdown(_HTML_CIERRE_DIV, unsafe_allow_html=True)
     
-    # Aplicar filtros al dataframe
-    df_filtered = df_display.copy()
+    # Aplicar filtros al dataframe (solo lectura, sin copiar)
+    df_filtered = df_display
     
-    # Filtrar por programas seleccionados
-    if selected_programas:
-        # Crear una máscara para filtrar empresas que tengan al menos uno de los programas seleccionados
-        if 'PROGRAMAS_LISTA' in df_filtered.columns:
-            # Creamos un conjunto con los CUITs de empresas que tienen alguno de los programas seleccionados
-            cuits_con_programas = set()
-            for programa in selected_programas:
-                # Obtenemos los CUITs de empresas con este programa
-                cuits_programa = df_empresas[df_empresas['PROGRAMAS_LISTA'] == programa]['CUIT'].unique()
-                cuits_con_programas.update(cuits_programa)
-            # Filtramos el dataframe para incluir solo las empresas con los CUITs seleccionados
-            df_filtered = df_filtered[df_filtered['CUIT'].isin(cuits_con_programas)]
-        else:
-            # Si no tenemos la columna original, usamos el campo ADHERIDO agregado
-            mask = df_filtered['ADHERIDO'].apply(lambda x: any(programa in x.split(', ') for programa in selected_programas))
-            df_filtered = df_filtered[mask]
+    # Filtrar por programas seleccionados (las opciones salen de programas_lista, así que
+    # si hay programas seleccionados la columna existe)
+    if selected_programas and programas_lista is not None:
+        # CUITs de empresas que tienen alguno de los programas seleccionados
+        cuits_con_programas = df_empresas.loc[programas_lista.isin(selected_programas), 'CUIT'].unique()
+        # Filtramos el dataframe para incluir solo las empresas con los CUITs seleccionados
+        df_filtered = df_filtered[df_filtered['CUIT'].isin(cuits_con_programas)]
     
     # Filtrar por departamentos seleccionados
     if selected_departamentos and 'N_DEPARTAMENTO' in df_filtered.columns:
@@ -605,57 +1612,20 @@ def show_companies(df_empresas):
     st.markdown(f'<div class="filter-info">Mostrando {len(df_filtered)} de {len(df_display)} empresas ({filtros_texto})</div>', unsafe_allow_html=True)
 
     # Métricas y tabla final con mejor diseño
-    empresas_adh = df_filtered['CUIT'].nunique()
+    # df_filtered tiene un registro por CUIT, así que alcanza con contar máscaras sobre los arrays
+    # (sin armar DataFrames filtrados ni hacer nunique)
+    cuit_valido = df_filtered['CUIT'].notna().to_numpy()
+    empresas_adh = int(cuit_valido.sum())
     
     # Calcular empresas con y sin beneficiarios
-    empresas_con_benef = df_filtered[df_filtered['BENEF_COUNT'] > 0]['CUIT'].nunique()
-    empresas_sin_benef = df_filtered[df_filtered['BENEF_COUNT'].isna()]['CUIT'].nunique()
-    
-    # Calcular empresas por programa para mostrar en los KPIs usando los datos originales
-    programas_conteo = {}
-    programas_con_benef = {}
-    programas_sin_benef = {}
-    
-    if 'PROGRAMAS_LISTA' in df_empresas.columns:
-        # Usamos el dataframe original (antes del agrupamiento) para contar correctamente
-        df_empresas_original = df_empresas.copy()
-        
-        # Aplicamos los mismos filtros que aplicamos a df_filtered
-        if selected_programas:
-            df_empresas_original = df_empresas_original[df_empresas_original['PROGRAMAS_LISTA'].isin(selected_programas)]
-            
-        for programa in programas_unicos:
-            # Contar empresas que tienen este programa específico
-            empresas_programa = df_empresas_original[df_empresas_original['PROGRAMAS_LISTA'] == programa]
-            cuits_programa = empresas_programa['CUIT'].unique()
-            
-            # Total de empresas por programa
-            programas_conteo[programa] = len(cuits_programa)
-            
-            # Empresas con beneficiarios por programa
-            if 'BENEF_COUNT' in df_empresas_original.columns:
-                cuits_con_benef = empresas_programa[empresas_programa['BENEF_COUNT'] > 0]['CUIT'].unique()
-                programas_con_benef[programa] = len(cuits_con_benef)
-
-                # Empresas sin beneficiarios por programa
-                cuits_sin_benef = empresas_programa[empresas_programa['BENEF_COUNT'].isna()]['CUIT'].unique()
-                programas_sin_benef[programa] = len(cuits_sin_benef)
-    
-    # Obtener los dos programas principales para mostrar en cada KPI
-    programas_principales = sorted(programas_conteo.items(), key=lambda x: x[1], reverse=True)[:3] if programas_conteo else []
-    programas_con_benef_principales = sorted(programas_con_benef.items(), key=lambda x: x[1], reverse=True)[:3] if programas_con_benef else []
-    programas_sin_benef_principales = sorted(programas_sin_benef.items(), key=lambda x: x[1], reverse=True)[:3] if programas_sin_benef else []
+    benef_count = df_filtered['BENEF_COUNT'].to_numpy(dtype='float64', na_value=np.nan)
+    empresas_con_benef = int(((benef_count > 0) & cuit_valido).sum())
+    empresas_sin_benef = int((np.isnan(benef_count) & cuit_valido).sum())
     
     # Layout para los KPIs - 3 columnas
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        # Crear el subtexto con el desglose por programa
-        subtexto = ""
-        if programas_principales:
-            subtexto_items = [f"{prog}: {count}" for prog, count in programas_principales]
-            subtexto = f"<div class='metric-subtitle'>{' - '.join(subtexto_items)}</div>"
-        
         st.markdown("""
             <div class="metric-card">
                 <div class="metric-label">Empresas Adheridas</div>
@@ -666,11 +1636,6 @@ def show_companies(df_empresas):
         """.format(empresas_adh, TOOLTIPS_DESCRIPTIVOS.get("EMPRESAS ADHERIDAS", "")), unsafe_allow_html=True)
     
     with col2:
-        # Crear el subtexto con el desglose por programa para empresas con beneficiarios
-        if programas_con_benef_principales:
-            subtexto_items = [f"{prog}: {count}" for prog, count in programas_con_benef_principales]
-            
-        
         st.markdown("""
             <div class="metric-card">
                 <div class="metric-label">Empresas con Beneficiarios</div>
@@ -681,11 +1646,6 @@ def show_companies(df_empresas):
         """.format(empresas_con_benef, TOOLTIPS_DESCRIPTIVOS.get("EMPRESAS CON BENEFICIARIOS", "")), unsafe_allow_html=True)
         
     with col3:
-        # Crear el subtexto con el desglose por programa para empresas sin beneficiarios
-        if programas_sin_benef_principales:
-            subtexto_items = [f"{prog}: {count}" for prog, count in programas_sin_benef_principales]
-            
-        
         st.markdown("""
             <div class="metric-card">
                 <div class="metric-label">Empresas sin Beneficiarios</div>
@@ -702,72 +1662,45 @@ def show_companies(df_empresas):
     st.markdown('<div class="section-title">Perfil de Demanda</div>', unsafe_allow_html=True)
 
 
-    # Filtrar solo los datos que tengan información de puesto y categoría
+    # Filtrar solo los datos que tengan información de puesto y categoría. Se proyecta antes del
+    # dropna: los gráficos (ya cacheados) solo leen estas columnas y así no se copia df_empresas entero
     required_columns = ['N_EMPRESA', 'CUIT', 'N_PUESTO_EMPLEO', 'N_CATEGORIA_EMPLEO']
     if all(col in df_empresas.columns for col in required_columns):
-        df_perfil_demanda = df_empresas.dropna(subset=required_columns)
+        df_perfil_demanda = df_empresas[required_columns].dropna()
     else:
         df_perfil_demanda = pd.DataFrame()
 
     if df_perfil_demanda.empty:
-        st.markdown("""
-            <div class="info-box status-info">
-                <strong>Información:</strong> No hay datos disponibles de perfil de demanda.
-            </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_HTML_INFO_BOX.format(estado="info", titulo="Información", mensaje="No hay datos disponibles de perfil de demanda."), unsafe_allow_html=True)
     else:
         # Crear las dos columnas
         col1, col2 = st.columns(2)
 
         # --- Visualización 1: Tabla Agrupada (en col1) con mejor estilo ---
         with col1:
-            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            st.markdown(_HTML_CHART_CONTAINER, unsafe_allow_html=True)
             st.markdown('<h3 style="font-size: 18px; margin-bottom: 15px;">Puestos y Categorías Demandadas por Empresa</h3>', unsafe_allow_html=True)
             # Gráfico de torta por tipo de empresa
             if 'N_CATEGORIA_EMPLEO' in df_perfil_demanda.columns and 'CUIT' in df_perfil_demanda.columns:
-                df_actividad = df_perfil_demanda.groupby('N_CATEGORIA_EMPLEO', observed=True)['CUIT'].nunique().reset_index()
-                df_actividad.columns = ['Actividad Principal', 'Cantidad de Empresas']
-                df_actividad = df_actividad.sort_values(by='Cantidad de Empresas', ascending=False).head(10)
-                
-                fig_actividad = px.pie(
-                    df_actividad, 
-                    names='Actividad Principal', 
-                    values='Cantidad de Empresas',
-                    title='Distribución por Actividad Principal (Top 10)',
-                    color_discrete_sequence=px.colors.qualitative.Pastel
-                )
-                fig_actividad.update_layout(showlegend=True, title_x=0.5)
+                df_actividad = df_perfil_demanda[['N_CATEGORIA_EMPLEO', 'CUIT']]
+                fig_actividad = _build_actividad_fig(_clave_datos(huella, df_actividad), df_actividad)
                 st.plotly_chart(fig_actividad)
             else:
                 st.info("No hay datos de tipo de empresa para graficar.")
-            st.markdown('</div>', unsafe_allow_html=True)
+            st.markdown(_HTML_CIERRE_DIV, unsafe_allow_html=True)
         
         # --- Visualización 2: Gráfico de Barras por Categoría (Top 10) (en col2) ---
         with col2:
-            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            st.markdown(_HTML_CHART_CONTAINER, unsafe_allow_html=True)
             st.markdown('<h3 style="font-size: 18px; margin-bottom: 15px;">Top 10 - Categorías de Empleo por Nº de Empresas</h3>', unsafe_allow_html=True)
 
             if 'N_PUESTO_EMPLEO' in df_perfil_demanda.columns and 'CUIT' in df_perfil_demanda.columns:
-                categoria_counts = df_perfil_demanda.groupby('N_PUESTO_EMPLEO', observed=True)['CUIT'].nunique().reset_index()
-                categoria_counts.columns = ['Puesto', 'Nº de Empresas']
-                
-                top_10_categorias = categoria_counts.sort_values(by='Nº de Empresas', ascending=False).head(10)
-                
-                fig_bar = px.bar(
-                    top_10_categorias, 
-                    x='Nº de Empresas', 
-                    y='Puesto',
-                    orientation='h',
-                    title='Top 10 Puestos por Empresas (CUITs únicos)',
-                    labels={'Nº de Empresas': 'Nº de Empresas (CUITs únicos)', 'Puesto': 'Puesto de Empleo'},
-                    color_discrete_sequence=px.colors.qualitative.Vivid
-                )
-                fig_bar.update_layout(yaxis={'categoryorder':'total ascending'}, title_x=0.5)
+                fig_bar = _build_top10_categorias_fig(df_perfil_demanda[['N_PUESTO_EMPLEO', 'CUIT']], huella)
                 st.plotly_chart(fig_bar)
             else:
                 st.info("No hay datos de puestos de empleo para graficar.")
 
-            st.markdown('</div>', unsafe_allow_html=True)
+            st.markdown(_HTML_CIERRE_DIV, unsafe_allow_html=True)
 
 def show_inscriptions(df_inscriptos_empleo, geojson_data):
     """
@@ -781,45 +1714,27 @@ def show_inscriptions(df_inscriptos_empleo, geojson_data):
     
     # Verificar que los DataFrames no estén vacíos
     if df_inscriptos_empleo is None:
-        st.markdown("""
-            <div class="info-box status-warning">
-                <strong>Información:</strong> Uno o más DataFrames necesarios no están disponibles.
-            </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_HTML_INFO_BOX.format(estado="warning", titulo="Información", mensaje="Uno o más DataFrames necesarios no están disponibles."), unsafe_allow_html=True)
         return
     
     try:
-        # Limpiar CUIL
-        if 'CUIL' in df_inscriptos_empleo.columns:
-            df_inscriptos_empleo['CUIL'] = df_inscriptos_empleo['CUIL'].astype(str).str.replace("-", "", regex=False)
-        
-        # Definir mapeo de programas según IDETAPA
-        programas = {
-            53: "Programa Primer Paso",
-            51: "Más 26",
-            54: "CBA Mejora",
-            55: "Nueva Oportunidad",
-            57: "Más 26 [2025]",
-            58: "PPP [2025]"
-        }
-        
         # Mostrar selector de programa si existe la columna IDETAPA
         programa_seleccionado = None
         programa_seleccionado_nombre = "Todos los programas"
         
         if 'IDETAPA' in df_inscriptos_empleo.columns:
-            # Obtener las etapas disponibles en los datos
-            etapas_disponibles = df_inscriptos_empleo['IDETAPA'].dropna().unique()
-            etapas_validas = [etapa for etapa in etapas_disponibles if etapa in programas.keys()]
+            # Obtener las etapas disponibles en los datos (cacheado: no cambia entre reruns)
+            etapas_validas = _etapas_validas(df_inscriptos_empleo['IDETAPA'])
             
             if len(etapas_validas) > 0:
                 # Crear selector de programa con estilo mejorado
                 st.markdown('<div style="background-color: #f0f2f6; padding: 15px; border-radius: 10px; margin-bottom: 20px;">', unsafe_allow_html=True)
                 st.markdown('<h3 style="font-size: 18px; margin: 0 0 10px 0;">Seleccionar Programa (Opcional)</h3>', unsafe_allow_html=True)
                 
-                # Crear opciones para el selector (incluir opción "Todos")
+                # Crear opciones para el selector (incluir opción "Todos"). El nombre se busca solo
+                # para las etapas únicas, que ya están filtradas a las de PROGRAMAS_ETAPA
                 opciones_programa = {"Todos los programas": None}
-                opciones_programa.update({programas.get(etapa, f"Programa {etapa}"): etapa for etapa in etapas_validas})
+                opciones_programa.update({PROGRAMAS_ETAPA[etapa]: etapa for etapa in etapas_validas})
                 
                 # Selector de programa
                 programa_seleccionado_nombre = st.selectbox(
@@ -833,7 +1748,7 @@ def show_inscriptions(df_inscriptos_empleo, geojson_data):
                 # Obtener el ID de etapa seleccionado
                 programa_seleccionado = opciones_programa[programa_seleccionado_nombre]
                 
-                st.markdown('</div>', unsafe_allow_html=True)
+                st.markdown(_HTML_CIERRE_DIV, unsafe_allow_html=True)
 
         # === SECCIÓN 2: FILTROS DE LA PESTAÑA BENEFICIARIOS ===
         df_inscriptos_filtrado = render_tab_filters(df_inscriptos_empleo, key_prefix="benef_tab")
@@ -845,22 +1760,27 @@ def show_inscriptions(df_inscriptos_empleo, geojson_data):
 
         # === SECCIÓN 3: KPIs DEL PROGRAMA SELECCIONADO (funcionalidad original) ===
         if programa_seleccionado is not None:
-            # Filtrar los datos según el programa seleccionado para KPIs específicos
-            df_programa = df_inscriptos_empleo[df_inscriptos_empleo['IDETAPA'] == programa_seleccionado].copy()
-            
             # Título dinámico según el programa seleccionado
             st.markdown(f'<h2 style="font-size: 24px; margin-bottom: 20px;">KPIs de {programa_seleccionado_nombre}</h2>', unsafe_allow_html=True)
                 
-            # Calcular métricas específicas del programa
-            if not df_programa.empty and 'ID_EST_FIC' in df_programa.columns:
-                conteo_estados = df_programa['ID_EST_FIC'].value_counts()
-                total_match = len(df_programa[df_programa['ID_EST_FIC'] == 8]) if 8 in conteo_estados else 0
-                total_empresa_no_apta = conteo_estados.get(2, 0)  
-                total_benef = conteo_estados.get(14, 0)
-                total_validos = conteo_estados.get(13, 0)
-                total_inscriptos = conteo_estados.get(12, 0)
-                total_pendientes = conteo_estados.get(3, 0)
-                total_rechazados = conteo_estados.get(17, 0) + conteo_estados.get(18, 0) + conteo_estados.get(19, 0)
+            # Calcular métricas específicas del programa a partir de la tabla etapa x estado
+            # (cacheada para todos los programas, no se recorre el DataFrame al cambiar de programa)
+            conteo_estados = None
+            if 'ID_EST_FIC' in df_inscriptos_empleo.columns:
+                conteo_por_etapa = _conteo_estados_por_etapa(df_inscriptos_empleo[['IDETAPA', 'ID_EST_FIC']])
+                if programa_seleccionado in conteo_por_etapa.index:
+                    conteo_estados = conteo_por_etapa.loc[programa_seleccionado]
+            
+            if conteo_estados is not None:
+                # Pasar la fila a un dict de enteros una vez; las lecturas siguientes no pasan por el indexado de pandas
+                conteo = dict(zip(ESTADOS_FICHA_KPI, conteo_estados.to_numpy().tolist()))
+                total_match = conteo[8]
+                total_empresa_no_apta = conteo[2]
+                total_benef = conteo[14]
+                total_validos = conteo[13]
+                total_inscriptos = conteo[12]
+                total_pendientes = conteo[3]
+                total_rechazados = sum(conteo[estado] for estado in ESTADOS_FICHA_RECHAZO)
                 
                 # Crear un diccionario con los resultados para pasarlo a la función de KPIs
                 resultados = {
@@ -876,268 +1796,60 @@ def show_inscriptions(df_inscriptos_empleo, geojson_data):
                 # Usar la función para crear los KPIs
                 kpi_data = create_empleo_kpis(resultados, programa_seleccionado_nombre)
                 display_kpi_row(kpi_data)
+            elif 'ID_EST_FIC' in df_inscriptos_empleo.columns:
+                # Programa sin fichas: no hay KPIs que armar
+                st.info("No hay registros para el programa seleccionado.")
 
         # === SECCIÓN 4: TABLA PIVOT DE TODOS LOS PROGRAMAS ===
         # Conteo de ID_FICHA por PROGRAMA y ESTADO_FICHA
         if 'PROGRAMA' in df_inscriptos_filtrado.columns and 'N_ESTADO_FICHA' in df_inscriptos_filtrado.columns:
-            # Contar filas por PROGRAMA y ESTADO_FICHA
-            pivot_table = df_inscriptos_filtrado.pivot_table(
-                index='PROGRAMA',
-                columns='N_ESTADO_FICHA',
-                aggfunc='size',
-                fill_value=0
-            )
-
-            # Ajustar la columna 'BENEFICIARIO' para contar solo beneficiarios activos
-            if 'BEN_N_ESTADO' in df_inscriptos_filtrado.columns:
-                df_activos = df_inscriptos_filtrado[
-                    (df_inscriptos_filtrado['N_ESTADO_FICHA'] == "BENEFICIARIO") &
-                    (df_inscriptos_filtrado['BEN_N_ESTADO'] == "ACTIVO")
-                ]
-                if not df_activos.empty:
-                    pivot_activos = df_activos.groupby('PROGRAMA').size()
-                    # Sobrescribir la columna BENEFICIARIO con el conteo de activos
-                    if 'BENEFICIARIO' in pivot_table.columns:
-                        pivot_table['BENEFICIARIO'] = pivot_activos.reindex(pivot_table.index, fill_value=0)
-            
-            # Definir el orden de las columnas por grupos
-            grupo1 = ["POSTULANTE APTO", "INSCRIPTO", "BENEFICIARIO"]
-            grupo2 = ["INSCRIPTO - CTI", "RETENIDO - CTI", "VALIDADO - CTI", "BENEFICIARIO- CTI", "BAJA - CTI"]
-            grupo3 = ["POSTULANTE SIN EMPRESA", "FUERA CUPO DE EMPRESA", "RECHAZO FORMAL", "INSCRIPTO NO ACEPTADO", "DUPLICADO", "EMPRESA NO APTA"]
-            
-            # Crear una lista con todas las columnas en el orden deseado
-            columnas_ordenadas = grupo1 + grupo2 + grupo3
-            
-            # Añadir totales primero para cálculos internos, pero no los mostraremos
-            pivot_table['Total'] = pivot_table.sum(axis=1)
-            pivot_table.loc['Total'] = pivot_table.sum()
-            
-            # Reordenar con las columnas existentes más cualquier otra columna y el total al final (para cálculos)
-            pivot_table = pivot_table.reindex(columns=columnas_ordenadas + [col for col in pivot_table.columns if col not in columnas_ordenadas and col != 'Total'] + ['Total'])
+            # Conteo y tablas HTML cacheados: solo se regeneran si cambian los datos filtrados
+            columnas_pivot = [col for col in ['PROGRAMA', 'N_ESTADO_FICHA', 'BEN_N_ESTADO'] if col in df_inscriptos_filtrado.columns]
+            html_table_main, html_table_grupo3 = _tablas_pivot_html(df_inscriptos_filtrado[columnas_pivot])
             
             # Mostrar tabla con estilo mejorado
             st.markdown('<div class="section-title">Conteo de personas por Programa y Estado</div>', unsafe_allow_html=True)
             
-            # Convertir pivot table a DataFrame para mejor visualización
-            pivot_df = pivot_table.reset_index()
-            
-            # Separar las columnas por grupos
-            grupo1_cols = [col for col in grupo1 if col in pivot_table.columns]
-            grupo2_cols = [col for col in grupo2 if col in pivot_table.columns]
-            grupo3_cols = [col for col in grupo3 if col in pivot_table.columns]
-            otros_cols = [col for col in pivot_table.columns if col not in grupo1 and col not in grupo2 and col not in grupo3 and col != 'Total' and col != 'PROGRAMA']
-            
-            # Generar tabla HTML principal
-            html_table_main = f"""
-            <div style="overflow-x: auto; margin-bottom: 20px;">
-                <table class="styled-table">
-                    <thead>
-                        <tr>
-                            <th rowspan="2">PROGRAMA</th>
-                            <th colspan="{len(grupo1_cols)}" style="background-color: var(--color-primary); border-right: 2px solid white;">Beneficiarios EL (Entrenamiento Laboral)</th>
-                            <th colspan="{len(grupo2_cols)}" style="background-color: var(--color-secondary); border-right: 2px solid white;">Beneficiarios CTI (Contratados)</th>
-                            <th rowspan="2" style="background-color: #e6f0f7; color: #333;">Totales Beneficiario</th>
-                        </tr>
-                        <tr>
-            """
-            
-            # Agregar las cabeceras de columnas para la tabla principal
-            for col in grupo1_cols + grupo2_cols:
-                # Determinar el estilo según el grupo
-                if col == "BENEFICIARIO":
-                    style = 'style="background-color: #0066a0; color: white;"'
-                elif col == "BENEFICIARIO- CTI":
-                    style = 'style="background-color: #0080b3; color: white;"'
-                elif col in grupo1:
-                    style = 'style="background-color: var(--color-primary);"'
-                elif col in grupo2:
-                    style = 'style="background-color: var(--color-secondary);"'
-                else:
-                    style = 'style="background-color: var(--color-accent-2);"'
-                
-                # Agregar el tooltip si existe para este estado
-                tooltip = ESTADO_TOOLTIPS.get(col, "")
-                if tooltip:
-                    html_table_main += f'<th {style} title="{tooltip}">{col}</th>'
-                else:
-                    html_table_main += f'<th {style}>{col}</th>'
-            
-            html_table_main += """
-                        </tr>
-                    </thead>
-                    <tbody>
-            """
-            
-            # Agregar filas de datos para la tabla principal
-            for index, row in pivot_df.iterrows():
-                html_table_main += '<tr>'
-
-                # Columna PROGRAMA
-                if row['PROGRAMA'] == 'Total':
-                    html_table_main += f'<td style="font-weight: bold; background-color: #f2f2f2; color: #333;">{row["PROGRAMA"]}</td>'
-                else:
-                    html_table_main += f'<td style="color: #333;">{row["PROGRAMA"]}</td>'
-                
-                # Columnas de datos para grupos 1 y 2
-                for col in grupo1_cols + grupo2_cols:
-                    if row['PROGRAMA'] == 'Total':
-                        # Destacar también las celdas de totales para BENEFICIARIO y BENEFICIARIO- CTI
-                        if col == "BENEFICIARIO":
-                            cell_style = 'style="font-weight: bold; background-color: #e6f0f7; color: #333; text-align: right;"'
-                        elif col == "BENEFICIARIO- CTI":
-                            cell_style = 'style="font-weight: bold; background-color: #e6f0f7; color: #333; text-align: right;"'
-                        else:
-                            cell_style = 'style="font-weight: bold; background-color: #f2f2f2; color: #333; text-align: right;"'
-                    else:
-                        # Destacar las celdas de datos para BENEFICIARIO y BENEFICIARIO- CTI
-                        if col == "BENEFICIARIO":
-                            cell_style = 'style="background-color: #e6f0f7; color: #333; text-align: right;"'
-                        elif col == "BENEFICIARIO- CTI":
-                            cell_style = 'style="background-color: #e6f0f7; color: #333; text-align: right;"'
-                        else:
-                            cell_style = 'style="color: #333; text-align: right;"'
-                    
-                    # Manejar posibles valores NaN antes de convertir a entero
-                    if pd.isna(row[col]):
-                        html_table_main += f'<td {cell_style}>0</td>'
-                    else:
-                        html_table_main += f'<td {cell_style}>{int(row[col]):,}'.replace(',', '.')+'</td>'
-                
-                # Celda Sub total
-                val1 = int(row['BENEFICIARIO']) if 'BENEFICIARIO' in row and not pd.isnull(row['BENEFICIARIO']) else 0
-                val2 = int(row['BENEFICIARIO- CTI']) if 'BENEFICIARIO- CTI' in row and not pd.isnull(row['BENEFICIARIO- CTI']) else 0
-                cell_value = val1 + val2
-                cell_style = 'style="background-color: #e6f0f7; color: #333; text-align: right; font-weight: bold;"'
-                html_table_main += f'<td {cell_style}>{cell_value:,}'.replace(',', '.')+'</td>'
-                html_table_main += '</tr>'
-            
-            html_table_main += """
-                    </tbody>
-                </table>
-            </div>
-            """
-            
             # Mostrar la tabla principal
             st.markdown(html_table_main, unsafe_allow_html=True)
             
             # Crear un botón desplegable para mostrar la tabla del grupo 3 y otros
-            if grupo3_cols or otros_cols:
+            if html_table_grupo3 is not None:
                 with st.expander("Ver casos especiales (Bajas y Rechazos) y otros estados"):
-                    # Generar tabla HTML secundaria para grupo 3 y otros
-                    html_table_grupo3 = """
-                    <div style="overflow-x: auto; margin-bottom: 20px;">
-                        <table class="styled-table">
-                            <thead>
-                                <tr>
-                                    <th>PROGRAMA</th>
-                    """
-                    
-                    # Agregar cabeceras para el grupo 3
-                    for col in grupo3_cols:
-                        style = 'style="background-color: var(--color-accent-3);"'
-                        html_table_grupo3 += f'<th {style}>{col}</th>'
-                    
-                    # Agregar cabeceras para otros
-                    if otros_cols:
-                        otros_nombres = ", ".join(otros_cols)
-                        html_table_grupo3 += f'<th colspan="{len(otros_cols)}" style="background-color: var(--color-accent-2);">Otros (Estados: {otros_nombres})</th>'
-                    
-                    # Si hay columnas en "otros", agregar una segunda fila para los nombres específicos
-                    if otros_cols:
-                        html_table_grupo3 += """
-                                </tr>
-                                <tr>
-                                    <th></th>
-                        """
-                        # Agregar los nombres de cada estado en "otros"
-                        for _ in grupo3_cols:
-                            html_table_grupo3 += "<th></th>"
-                        
-                        for col in otros_cols:
-                            style = 'style="background-color: var(--color-accent-2);"'
-                            html_table_grupo3 += f'<th {style}>{col}</th>'
-                    
-                    html_table_grupo3 += """
-                                </tr>
-                            </thead>
-                            <tbody>
-                    """
-                    
-                    # Agregar filas de datos para la tabla del grupo 3 y otros
-                    for index, row in pivot_df.iterrows():
-                        if row['PROGRAMA'] != 'Total':
-                            html_table_grupo3 += '<tr>'
-                            html_table_grupo3 += f'<td>{row["PROGRAMA"]}</td>'
-                            
-                            # Columnas de datos para el grupo 3
-                            for col in grupo3_cols:
-                                cell_style = 'style="text-align: right;"'
-                                if pd.isna(row[col]):
-                                    html_table_grupo3 += f'<td {cell_style}>0</td>'
-                                else:
-                                    html_table_grupo3 += f'<td {cell_style}>{int(row[col]):,}'.replace(',', '.')+'</td>'
-                            
-                            # Columnas de datos para otros
-                            for col in otros_cols:
-                                cell_style = 'style="text-align: right;"'
-                                if pd.isna(row[col]):
-                                    html_table_grupo3 += f'<td {cell_style}>0</td>'
-                                else:
-                                    html_table_grupo3 += f'<td {cell_style}>{int(row[col]):,}'.replace(',', '.')+'</td>'
-                            
-                            html_table_grupo3 += '</tr>'
-                    
-                    html_table_grupo3 += """
-                            </tbody>
-                        </table>
-                    </div>
-                    """
-                    
-                    # Mostrar la tabla del grupo 3 y otros
                     st.markdown(html_table_grupo3, unsafe_allow_html=True)
 
         # === SECCIÓN 5: BENEFICIARIOS POR LOCALIDAD ===
         st.subheader("Beneficiarios por Localidad")
         
         # Filtrar solo beneficiarios activos: N_ESTADO_FICHA == 'BENEFICIARIO' y BEN_N_ESTADO == 'ACTIVO'
+        # (se filtra y agrega una sola vez para esta sección y la distribución geográfica).
+        # Máscara y proyección en un solo .loc: solo se copian las columnas que usa el conteo
         if 'BEN_N_ESTADO' in df_inscriptos_filtrado.columns:
-            df_beneficiarios = df_inscriptos_filtrado[(df_inscriptos_filtrado['N_ESTADO_FICHA'] == "BENEFICIARIO") & (df_inscriptos_filtrado['BEN_N_ESTADO'] == "ACTIVO")]
+            columnas_conteo = [col for col in ['ID_DEPARTAMENTO_GOB', 'N_DEPARTAMENTO', 'N_LOCALIDAD', 'N_ESTADO_FICHA'] if col in df_inscriptos_filtrado.columns]
+            mascara_beneficiarios = (df_inscriptos_filtrado['N_ESTADO_FICHA'] == "BENEFICIARIO") & (df_inscriptos_filtrado['BEN_N_ESTADO'] == "ACTIVO")
+            df_beneficiarios = df_inscriptos_filtrado.loc[mascara_beneficiarios, columnas_conteo]
         else:
             df_beneficiarios = pd.DataFrame()
         
+        df_mapa_geo = None
         if df_beneficiarios.empty:
             st.warning("No hay beneficiarios con los filtros seleccionados.")
         else:
-            # Crear dataframe de beneficiarios EL (activos)
-            df_beneficiarios_el = df_beneficiarios.copy()
-            df_el_count = df_beneficiarios_el.groupby(['N_DEPARTAMENTO', 'N_LOCALIDAD'], observed=True).size().reset_index(name='BENEFICIARIO')
-            
             # No contamos CTI aquí (criterio estricto: solo N_ESTADO_FICHA == 'BENEFICIARIO' y BEN_N_ESTADO == 'ACTIVO')
-            df_cti_count = pd.DataFrame(columns=['N_DEPARTAMENTO', 'N_LOCALIDAD', 'BENEFICIARIO- CTI'])
-            
-            # Unir los dataframes
-            df_mapa = pd.merge(df_el_count, df_cti_count, on=['N_DEPARTAMENTO', 'N_LOCALIDAD'], how='outer')
-            df_mapa['BENEFICIARIO'] = df_mapa['BENEFICIARIO'].fillna(0).astype(int)
-            df_mapa['BENEFICIARIO- CTI'] = df_mapa['BENEFICIARIO- CTI'].fillna(0).astype(int)
-            df_mapa['TOTAL'] = df_mapa['BENEFICIARIO'] + df_mapa['BENEFICIARIO- CTI']
-            
-            # Ordenar y mostrar tabla
-            df_mapa_sorted = df_mapa.sort_values(['TOTAL', 'N_DEPARTAMENTO'], ascending=[False, True])
-            
-            styled_df = df_mapa_sorted.style \
-                .background_gradient(subset=['BENEFICIARIO', 'BENEFICIARIO- CTI', 'TOTAL'], cmap='Blues') \
-                .format(thousands=".", precision=0)
+            df_mapa, df_mapa_geo = _agregar_beneficiarios(df_beneficiarios)
             
+            # Mostrar tabla (df_mapa ya viene ordenado desde la agregación cacheada). Se pasa el
+            # DataFrame sin Styler: el formato de miles lo resuelve column_config en el navegador
             st.dataframe(
-                styled_df,
+                df_mapa,
                 width='stretch',
                 hide_index=True,
                 column_config={
                     "N_DEPARTAMENTO": st.column_config.TextColumn("Departamento"),
                     "N_LOCALIDAD": st.column_config.TextColumn("Localidad"),
-                    "BENEFICIARIO": st.column_config.NumberColumn("Beneficiarios", help="Cantidad de beneficiarios regulares"),
-                    "BENEFICIARIO- CTI": st.column_config.NumberColumn("Beneficiarios CTI", help="Beneficiarios en situación crítica"),
-                    "TOTAL": st.column_config.NumberColumn("Total General", help="Suma total de beneficiarios")
+                    "BENEFICIARIO": st.column_config.NumberColumn("Beneficiarios", help="Cantidad de beneficiarios regulares", format="localized"),
+                    "BENEFICIARIO- CTI": st.column_config.NumberColumn("Beneficiarios CTI", help="Beneficiarios en situación crítica", format="localized"),
+                    "TOTAL": st.column_config.NumberColumn("Total General", help="Suma total de beneficiarios", format="localized")
                 },
                 height=400
             )
@@ -1147,53 +1859,23 @@ def show_inscriptions(df_inscriptos_empleo, geojson_data):
             if df_inscriptos_filtrado['N_DEPARTAMENTO'].nunique() <= 5:  # Mostrar mapa solo si hay pocos departamentos
                 st.markdown('<h3 style="font-size: 20px; margin: 20px 0 15px 0;">Distribución Geográfica</h3>', unsafe_allow_html=True)
                 
-                # Filtrar solo beneficiarios activos para el mapa
-                if 'BEN_N_ESTADO' in df_inscriptos_filtrado.columns:
-                    df_beneficiarios_mapa = df_inscriptos_filtrado[(df_inscriptos_filtrado['N_ESTADO_FICHA'] == "BENEFICIARIO") & (df_inscriptos_filtrado['BEN_N_ESTADO'] == "ACTIVO")]
-                else:
-                    df_beneficiarios_mapa = pd.DataFrame()
-                
-                if not df_beneficiarios_mapa.empty and 'ID_DEPARTAMENTO_GOB' in df_beneficiarios_mapa.columns:
-                    df_beneficiarios_el = df_beneficiarios_mapa.copy()
-                    df_el_count = df_beneficiarios_el.groupby(['ID_DEPARTAMENTO_GOB', 'N_DEPARTAMENTO'], observed=True).size().reset_index(name='BENEFICIARIO')
-                    
-                    df_cti_count = pd.DataFrame(columns=['ID_DEPARTAMENTO_GOB', 'N_DEPARTAMENTO', 'BENEFICIARIO- CTI'])
-                    
-                    df_mapa_geo = pd.merge(df_el_count, df_cti_count, on=['ID_DEPARTAMENTO_GOB', 'N_DEPARTAMENTO'], how='outer')
-                    df_mapa_geo['BENEFICIARIO'] = df_mapa_geo['BENEFICIARIO'].fillna(0).astype(int)
-                    # Asegurar columna CTI presente y sumar (será 0 si no hay datos)
-                    if 'BENEFICIARIO- CTI' not in df_mapa_geo.columns:
-                        df_mapa_geo['BENEFICIARIO- CTI'] = 0
-                    df_mapa_geo['BENEFICIARIO- CTI'] = df_mapa_geo['BENEFICIARIO- CTI'].fillna(0).astype(int)
-                    df_mapa_geo['Total'] = df_mapa_geo['BENEFICIARIO'] + df_mapa_geo['BENEFICIARIO- CTI']
-                    
-                    # Convertir ID_DEPARTAMENTO_GOB a string
-                    df_mapa_geo['ID_DEPARTAMENTO_GOB'] = df_mapa_geo['ID_DEPARTAMENTO_GOB'].apply(lambda x: str(int(x)) if pd.notnull(x) else "")
-                    
-                    # Procesar GeoJSON
-                    import geopandas as gpd
-                    geojson_dict = None
-                    if isinstance(geojson_data, (pd.DataFrame, gpd.GeoDataFrame)):
-                        try:
-                            gdf = gpd.GeoDataFrame(geojson_data)
-                            geojson_dict = gdf.__geo_interface__
-                        except Exception as e:
-                            st.error(f"Error convirtiendo DataFrame a GeoJSON: {e}")
-                    elif isinstance(geojson_data, dict) and 'features' in geojson_data:
-                        geojson_dict = geojson_data
+                # Reutilizar el conteo por departamento de los beneficiarios activos
+                if df_mapa_geo is not None:
+                    # Procesar GeoJSON (conversión y normalización de CODDEPTO cacheadas)
+                    geojson_dict, geojson_key = None, ()
+                    try:
+                        geojson_dict, geojson_key = _normalize_geojson(geojson_data)
+                    except Exception as e:
+                        st.error(f"Error convirtiendo DataFrame a GeoJSON: {e}")
                     
                     if geojson_dict and 'features' in geojson_dict:
-                        # Normalizar IDs en GeoJSON
-                        for f in geojson_dict['features']:
-                            f['properties']['CODDEPTO'] = str(f['properties']['CODDEPTO']).strip()
-                        
                         # Crear layout con tabla y mapa
                         table_col, map_col = st.columns([3, 1])
                         
                         with table_col:
                             st.markdown("### Beneficiarios por Departamento")
-                            df_mapa_display = df_mapa_geo.drop(columns=['ID_DEPARTAMENTO_GOB']).copy()
-                            df_mapa_display = df_mapa_display.rename(columns={
+                            # Una sola proyección renombrada: sin drop ni copia intermedia
+                            df_mapa_display = df_mapa_geo[['N_DEPARTAMENTO', 'BENEFICIARIO', 'BENEFICIARIO- CTI', 'Total']].rename(columns={
                                 'N_DEPARTAMENTO': 'Departamento',
                                 'BENEFICIARIO': 'Beneficiarios EL',
                                 'BENEFICIARIO- CTI': 'Beneficiarios CTI',
@@ -1203,43 +1885,11 @@ def show_inscriptions(df_inscriptos_empleo, geojson_data):
 
                         with map_col:
                             with st.spinner("Generando mapa..."):
-                                fig = px.choropleth_mapbox(
-                                    df_mapa_geo,
-                                    geojson=geojson_dict,
-                                    locations='ID_DEPARTAMENTO_GOB',
-                                    color='Total',
-                                    featureidkey="properties.CODDEPTO",
-                                    hover_data=['N_DEPARTAMENTO', 'BENEFICIARIO', 'BENEFICIARIO- CTI', 'Total'],
-                                    center={"lat": -31.4, "lon": -64.2},
-                                    zoom=6,
-                                    opacity=0.7,
-                                    mapbox_style="carto-positron",
-                                    color_continuous_scale="Blues",
-                                    labels={'Total': 'Beneficiarios'},
-                                    title="Distribución de Beneficiarios"
-                                )
-                                
-                                fig.update_layout(
-                                    margin={"r":0,"t":50,"l":0,"b":0},
-                                    coloraxis_colorbar={
-                                        "title": "Cantidad",
-                                        "tickformat": ",d"
-                                    },
-                                    title={
-                                        'text': "Beneficiarios por Departamento",
-                                        'y':0.97,
-                                        'x':0.5,
-                                        'xanchor': 'center',
-                                        'yanchor': 'top'
-                                    },
-                                    height=400
-                                )
+                                columnas_mapa = ['ID_DEPARTAMENTO_GOB', 'N_DEPARTAMENTO', 'BENEFICIARIO', 'BENEFICIARIO- CTI', 'Total']
+                                df_mapa_records = tuple(df_mapa_geo[columnas_mapa].itertuples(index=False, name=None))
+                                fig = _build_choropleth(df_mapa_records, geojson_key, geojson_dict)
                                 
                                 st.plotly_chart(fig)
     
     except Exception as e:
-        st.markdown(f"""
-            <div class="info-box status-warning">
-                <strong>Error:</strong> Se mostrarán los datos disponibles: {str(e)}
-            </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_HTML_INFO_BOX.format(estado="warning", titulo="Error", mensaje=f"Se mostrarán los datos disponibles: {str(e)}"), unsafe_allow_html=True)
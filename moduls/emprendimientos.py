@@ -112,19 +112,21 @@ def apply_filters(df):
     with col5:
         genero_sel = st.selectbox('Género', options=['Todos'] + sorted(df['Genero'].dropna().unique()), key='empr_genero_sel')
 
-    df_filtrado = df.copy()
-    if anio_sel != 'Todos':
-        df_filtrado = df_filtrado[df_filtrado['año'] == anio_sel]
-    if depto_sel != 'Todos':
-        df_filtrado = df_filtrado[df_filtrado['Departamento'] == depto_sel]
-    if Localidad_sel != 'Todos':
-        df_filtrado = df_filtrado[df_filtrado['Localidad'] == Localidad_sel]
-    if etapa_sel != 'Todos':
-        df_filtrado = df_filtrado[df_filtrado['Etapa del emprendimiento'] == etapa_sel]
-    if genero_sel != 'Todos':
-        df_filtrado = df_filtrado[df_filtrado['Genero'] == genero_sel]
-
-    return df_filtrado
+    # Combinar todos los filtros en una sola máscara y filtrar una vez (sin copias intermedias)
+    selecciones = {
+        'año': anio_sel,
+        'Departamento': depto_sel,
+        'Localidad': Localidad_sel,
+        'Etapa del emprendimiento': etapa_sel,
+        'Genero': genero_sel,
+    }
+    mask = None
+    for columna, seleccion in selecciones.items():
+        if seleccion != 'Todos':
+            mask_columna = df[columna].to_numpy() == seleccion
+            mask = mask_columna if mask is None else mask & mask_columna
+
+    return df if mask is None else df.loc[mask]
 
 def display_kpis(df):
     """
@@ -136,8 +138,10 @@ def display_kpis(df):
     total_emprendimientos = df['Nombre del Emprendimiento'].nunique()
     total_participantes = df['CUIL'].nunique()
     promedio_edad = df['Edad'].mean()
-    total_mujeres = (df['Genero'].str.lower() == 'femenino').sum()
-    total_hombres = (df['Genero'].str.lower() == 'masculino').sum()
+    # Una sola pasada de str.lower + value_counts para ambos géneros
+    conteo_genero = df['Genero'].str.lower().value_counts()
+    total_mujeres = int(conteo_genero.get('femenino', 0))
+    total_hombres = int(conteo_genero.get('masculino', 0))
 
     kpi_data = [
         {'title': 'Emprendimientos únicos', 'value_form': total_emprendimientos, 'color_class': 'kpi-primary'},
@@ -156,8 +160,9 @@ def display_rubros_chart(df):
         df: DataFrame filtrado
     """
     st.markdown('#### Emprendimientos por Rubro')
-    rubros = df['Rubro Ejecutado']
     sin_info = ['sin informacion', 'sin información', 'sin información ']
-    rubros = rubros[~rubros.str.strip().str.lower().isin(sin_info)]
-    rubros = rubros.value_counts().head(10)
+    # Contar primero y normalizar solo las etiquetas (una por rubro) en lugar de cada fila
+    rubros = df['Rubro Ejecutado'].value_counts()
+    rubros = rubros[~rubros.index.str.strip().str.lower().isin(sin_info)]
+    rubros = rubros.head(10)
     st.bar_chart(rubros)
\ No newline at end of file
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from moduls.empleo import normalizar_cuil, preparar_datos_empleo
+
+
+def test_preparar_datos_empleo_cuit_categorico():
+    # Los loaders dejan CUIT como category cuando tiene baja cardinalidad
+    df_empresas = pd.DataFrame({'CUIT': pd.Categorical(['20-12345678-3', None, '27-11111111-2', '20-12345678-3'])})
+    df_postulantes = pd.DataFrame({'CUIT': pd.Categorical(['20-12345678-3', '27-11111111-2'])})
+
+    preparar_datos_empleo(df_postulantes, None, df_empresas)
+
+    assert df_empresas['CUIT'].dtype == 'Int64'
+    assert df_empresas['CUIT'].tolist() == [20123456783, pd.NA, 27111111112, 20123456783]
+    assert df_postulantes['CUIT'].tolist() == [20123456783, 27111111112]
+
+
+def test_preparar_datos_empleo_cuit_texto_con_nulos():
+    df_empresas = pd.DataFrame({'CUIT': ['20-12345678-3', None]})
+
+    preparar_datos_empleo(None, None, df_empresas)
+
+    assert df_empresas['CUIT'].tolist() == [20123456783, pd.NA]
+
+
+def test_preparar_datos_empleo_cuit_categorico_no_numerico():
+    df_empresas = pd.DataFrame({'CUIT': pd.Categorical(['20123', 'SIN CUIT'])})
+
+    preparar_datos_empleo(None, None, df_empresas)
+
+    assert isinstance(df_empresas['CUIT'].dtype, pd.CategoricalDtype)
+    assert df_empresas['CUIT'].tolist() == ['20123', 'SIN CUIT']
+
+
+def test_normalizar_cuil_categorico():
+    df = pd.DataFrame({'CUIL': pd.Categorical(['20-1-3', None, '27-2-3', '20-1-3'])})
+
+    normalizar_cuil(df)
+
+    assert isinstance(df['CUIL'].dtype, pd.CategoricalDtype)
+    assert df['CUIL'].astype(object).where(df['CUIL'].notna(), None).tolist() == ['2013', None, '2723', '2013']
+
+
+def test_normalizar_cuil_categorias_que_coinciden_sin_guiones():
+    df = pd.DataFrame({'CUIL': pd.Categorical(['20-1-3', '2013', None])})
+
+    normalizar_cuil(df)
+
+    assert df['CUIL'].iloc[0] == df['CUIL'].iloc[1] == '2013'
+    assert pd.isna(df['CUIL'].iloc[2])
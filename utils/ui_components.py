@@ -106,7 +106,60 @@ def show_dev_dataframe_info(data, modulo_nombre="Módulo", info_caption=None, is
                 _show_single(df, name)
         else:
             _show_single(data, "DataFrame")
-    
+
+
+@st.cache_data(show_spinner=False)
+def _formatear_fecha_argentina(latest_date):
+    """
+    Convierte una fecha de actualización (UTC) a hora de Argentina y la formatea como texto.
+    Se cachea porque la fecha no cambia entre reruns y el parseo/conversión de zona horaria
+    es relativamente costoso.
+    Args:
+        latest_date: fecha como string, datetime u otro valor convertible por pandas.
+    Returns:
+        str: Fecha con formato dd/mm/aaaa HH:MM, o None si la fecha es inválida.
+    """
+    # Convertir a pandas datetime si es necesario
+    if isinstance(latest_date, str):
+        fecha_texto = latest_date
+        latest_date = pd.to_datetime(fecha_texto, format='%Y-%m-%d %H:%M:%S', errors='coerce')
+        if pd.isna(latest_date):
+            latest_date = pd.to_datetime(fecha_texto, format='%Y-%m-%d', errors='coerce')
+    elif isinstance(latest_date, datetime.datetime):
+        latest_date = pd.to_datetime(latest_date)
+    else:
+        # Si no es string ni datetime, intentar convertir genéricamente
+        latest_date = pd.to_datetime(latest_date, errors='coerce')
+
+    if pd.isna(latest_date):
+        return None
+
+    # Aplicar zona horaria de Argentina (UTC-3)
+    try:
+        # Intentar usar zoneinfo (Python 3.9+)
+        from zoneinfo import ZoneInfo
+        if latest_date.tz is None:
+            # Si la fecha no tiene zona horaria, asumimos que es UTC
+            latest_date = latest_date.tz_localize('UTC')
+        # Convertir a hora de Argentina
+        latest_date = latest_date.tz_convert(ZoneInfo('America/Argentina/Buenos_Aires'))
+    except ImportError:
+        # Fallback para versiones anteriores de Python
+        try:
+            import pytz
+            if latest_date.tz is None:
+                latest_date = latest_date.tz_localize('UTC')
+            argentina_tz = pytz.timezone('America/Argentina/Buenos_Aires')
+            latest_date = latest_date.tz_convert(argentina_tz)
+        except ImportError:
+            # Fallback simple: restar 3 horas si no hay zona horaria
+            if latest_date.tz is None:
+                latest_date = latest_date - pd.Timedelta(hours=3)
+
+    # Formatear la fecha para mostrar
+    return latest_date.strftime('%d/%m/%Y %H:%M')
+
+
 def show_last_update(dates, file_substring, mensaje="Última actualización"):
     """
     Muestra la fecha de última actualización para un archivo específico con zona horaria de Argentina.
@@ -122,18 +175,9 @@ def show_last_update(dates, file_substring, mensaje="Última actualización"):
     latest_date = file_dates[0] if file_dates else None
     
     if latest_date:
-        # Convertir a pandas datetime si es necesario
-        if isinstance(latest_date, str):
-            latest_date = pd.to_datetime(latest_date, format='%Y-%m-%d %H:%M:%S', errors='coerce')
-            if pd.isna(latest_date):
-                latest_date = pd.to_datetime(latest_date, format='%Y-%m-%d', errors='coerce')
-        elif isinstance(latest_date, datetime.datetime):
-            latest_date = pd.to_datetime(latest_date)
-        else:
-            # Si no es string ni datetime, intentar convertir genéricamente
-            latest_date = pd.to_datetime(latest_date, errors='coerce')
+        fecha_formateada = _formatear_fecha_argentina(latest_date)
         
-        if pd.isna(latest_date):
+        if fecha_formateada is None:
             st.markdown(f"""
                 <div style="background-color:#ffecec; padding:10px; border-radius:5px; margin-bottom:20px; font-size:0.9em; color:#a94442;">
                     <i class="fas fa-exclamation-circle"></i> <strong>{mensaje}:</strong> Fecha inválida
@@ -141,31 +185,6 @@ def show_last_update(dates, file_substring, mensaje="Última actualización"):
             """, unsafe_allow_html=True)
             return
         
-        # Aplicar zona horaria de Argentina (UTC-3)
-        try:
-            # Intentar usar zoneinfo (Python 3.9+)
-            from zoneinfo import ZoneInfo
-            if latest_date.tz is None:
-                # Si la fecha no tiene zona horaria, asumimos que es UTC
-                latest_date = latest_date.tz_localize('UTC')
-            # Convertir a hora de Argentina
-            latest_date = latest_date.tz_convert(ZoneInfo('America/Argentina/Buenos_Aires'))
-        except ImportError:
-            # Fallback para versiones anteriores de Python
-            try:
-                import pytz
-                if latest_date.tz is None:
-                    latest_date = latest_date.tz_localize('UTC')
-                argentina_tz = pytz.timezone('America/Argentina/Buenos_Aires')
-                latest_date = latest_date.tz_convert(argentina_tz)
-            except ImportError:
-                # Fallback simple: restar 3 horas si no hay zona horaria
-                if latest_date.tz is None:
-                    latest_date = latest_date - pd.Timedelta(hours=3)
-        
-        # Formatear la fecha para mostrar
-        fecha_formateada = latest_date.strftime('%d/%m/%Y %H:%M')
-        
         st.markdown(f"""
             <div style="background-color:#e9ecef; padding:10px; border-radius:5px; margin-bottom:20px; font-size:0.9em; color:#333333;">
                 <i class="fas fa-sync-alt"></i> <strong>{mensaje}:</strong> {fecha_formateada} (Hora Argentina)